@@ -5,9 +5,10 @@ and provides suggestions for fixing them.
 """
 
 import re
-from typing import Dict, List, Optional, Tuple, NamedTuple
+from collections import OrderedDict
+from typing import Dict, Iterator, List, Optional, Tuple, NamedTuple
 from enum import Enum
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 
 class ErrorSeverity(Enum):
@@ -31,6 +32,21 @@ class ErrorCategory(Enum):
     STYLE = "style"
 
 
+# Variable names that suggest a hardcoded credential
+SECRET_KEYWORDS = ("password", "api_key", "secret", "token")
+
+_SECRET_ASSIGNMENT = re.compile(
+    r'(' + '|'.join(SECRET_KEYWORDS) + r')\s*=\s*["\']([^"\']+)["\']',
+    re.IGNORECASE
+)
+
+
+def _has_keyword(text: str, keywords: Tuple[str, ...]) -> bool:
+    """Case-insensitive check for any of the literal keywords."""
+    folded = text.casefold()
+    return any(keyword in folded for keyword in keywords)
+
+
 @dataclass
 class ErrorPattern:
     """Definition of an error pattern."""
@@ -42,9 +58,21 @@ class ErrorPattern:
     description: str
     suggestion_template: str
     extract_groups: List[str] = None
+    # Lowercase literals, one of which must occur for the regex to match;
+    # checked first because a substring test is far cheaper than the regex
+    keywords: Tuple[str, ...] = ()
+    # Match group holding the line number, resolved once from extract_groups
+    line_group: Optional[int] = field(default=None, init=False, repr=False)
+    
+    def __post_init__(self):
+        """Resolve per-pattern constants used on every match."""
+        if self.extract_groups and 'line' in self.extract_groups:
+            self.line_group = self.extract_groups.index('line') + 1
     
     def match(self, text: str) -> Optional[re.Match]:
         """Check if pattern matches the text."""
+        if self.keywords and not _has_keyword(text, self.keywords):
+            return None
         return self.pattern.search(text)
     
     def get_suggestion(self, match: re.Match) -> str:
@@ -56,10 +84,33 @@ class ErrorPattern:
                     group_dict[group_name] = match.group(i + 1)
             return self.suggestion_template.format(**group_dict)
         return self.suggestion_template
+    
+    def make_detection(self, match: re.Match, context: str) -> "ErrorDetection":
+        """Build the detection result for a match of this pattern."""
+        line_number = None
+        if self.line_group is not None and self.line_group <= len(match.groups()):
+            try:
+                line_number = int(match.group(self.line_group))
+            except (TypeError, ValueError):
+                pass
+        
+        return ErrorDetection(
+            self.name,
+            self.category,
+            self.severity,
+            line_number,
+            self.description,
+            self.get_suggestion(match),
+            context
+        )
 
 
 class ErrorDetection(NamedTuple):
-    """Result of error detection."""
+    """Result of error detection.
+    
+    Kept as a NamedTuple so instances are immutable and carry no
+    per-instance __dict__; many of these are created per scanned chunk.
+    """
     
     error_type: str
     category: ErrorCategory
@@ -68,6 +119,30 @@ class ErrorDetection(NamedTuple):
     description: str
     suggestion: str
     context: str
+    
+    @property
+    def severity_rank(self) -> int:
+        """Sort rank of the severity, most severe first."""
+        return SEVERITY_RANK.get(self.severity, len(SEVERITY_RANK))
+
+
+# Sort ranks used to prioritize detections (lower comes first)
+SEVERITY_RANK = {
+    ErrorSeverity.CRITICAL: 0,
+    ErrorSeverity.ERROR: 1,
+    ErrorSeverity.WARNING: 2,
+    ErrorSeverity.INFO: 3,
+}
+
+CATEGORY_RANK = {
+    ErrorCategory.SECURITY: 0,
+    ErrorCategory.RUNTIME: 1,
+    ErrorCategory.SYNTAX: 2,
+    ErrorCategory.TYPE: 3,
+    ErrorCategory.IMPORT: 4,
+    ErrorCategory.PERFORMANCE: 5,
+    ErrorCategory.STYLE: 6,
+}
 
 
 # Define common error patterns
@@ -159,10 +234,11 @@ ERROR_PATTERNS = [
         name="hardcoded_secret",
         category=ErrorCategory.SECURITY,
         severity=ErrorSeverity.CRITICAL,
-        pattern=re.compile(r'(password|api_key|secret|token)\s*=\s*["\']([^"\']+)["\']', re.IGNORECASE),
+        pattern=_SECRET_ASSIGNMENT,
         description="Hardcoded secret detected",
         suggestion_template="Move {secret_type} to environment variable or config file",
-        extract_groups=["secret_type", "value"]
+        extract_groups=["secret_type", "value"],
+        keywords=SECRET_KEYWORDS
     ),
     
     # Performance Issues
@@ -240,6 +316,43 @@ ERROR_PATTERNS = [
 ]
 
 
+# Number of (session, content) pairs remembered by detect_new_errors
+SEEN_CONTENT_CACHE_SIZE = 256
+
+# Regex flags that can be scoped to one alternative of a merged pattern
+_INLINE_FLAGS = (
+    (re.IGNORECASE, "i"),
+    (re.MULTILINE, "m"),
+    (re.DOTALL, "s"),
+    (re.VERBOSE, "x"),
+)
+_BACKREFERENCE = re.compile(r'\\[1-9]|\(\?P=')
+# Assertions that see past the end of a line, so a pattern using them can
+# match differently on a line than on the whole text
+_TEXT_ANCHOR = re.compile(r'\\[AZ]|\(\?<?[=!]')
+
+
+def _line_context(
+    text: str, start: int, end: int, lines_before: int = 2, lines_after: int = 2
+) -> str:
+    """Get the line spanning text[start:end] plus surrounding lines.
+    
+    Walks to neighbouring newlines by offset so only the context itself is
+    copied, rather than splitting the whole text into lines.
+    """
+    for _ in range(lines_before):
+        if start == 0:
+            break
+        start = text.rfind('\n', 0, start - 1) + 1
+    for _ in range(lines_after):
+        if end >= len(text):
+            break
+        end = text.find('\n', end + 1)
+        if end == -1:
+            end = len(text)
+    return text[start:end]
+
+
 class ErrorDetector:
     """Detects errors in log output using predefined patterns."""
     
@@ -247,89 +360,145 @@ class ErrorDetector:
         """Initialize with error patterns."""
         self.patterns = patterns or ERROR_PATTERNS
         self._line_cache = {}
+        self._seen_content = OrderedDict()
+        # python_syntax_error spans several lines, so it is matched against
+        # the whole text; everything else is matched per line
+        self._text_patterns = [p for p in self.patterns if p.name == "python_syntax_error"]
+        self._line_patterns = [p for p in self.patterns if p.name != "python_syntax_error"]
+        self._line_prefilter = self._build_line_prefilter()
+    
+    def _build_line_prefilter(self) -> Optional[re.Pattern]:
+        """Merge the single-line patterns into one alternation.
+        
+        A line can only match one of the patterns if it matches the merged
+        regex, so most log lines are rejected with a single C-level search
+        instead of one search per pattern.
+        """
+        alternatives = []
+        for pattern in self._line_patterns:
+            if _BACKREFERENCE.search(pattern.pattern.pattern):
+                # Group numbers shift once merged, so keep matching these
+                # patterns individually
+                return None
+            if _TEXT_ANCHOR.search(pattern.pattern.pattern):
+                # The prefilter runs over the whole text; these patterns
+                # only behave the same when given one line at a time
+                return None
+            flags = "".join(
+                letter for flag, letter in _INLINE_FLAGS
+                if pattern.pattern.flags & flag
+            )
+            alternatives.append(f"(?{flags}:{pattern.pattern.pattern})")
+        if not alternatives:
+            return None
+        try:
+            # MULTILINE makes ^ and $ match at each line as they do per line
+            return re.compile("|".join(alternatives), re.MULTILINE)
+        except re.error:
+            return None
+        
+    def _candidate_lines(self, text: str, start: int) -> Iterator[Tuple[int, int]]:
+        """Yield (start, end) offsets of lines that may match a line pattern.
+        
+        The merged prefilter is searched over the whole text rather than
+        line by line, so lines without any hit are never sliced out. A hit
+        may span a newline, which only makes its line a false candidate;
+        a line with a real match always yields a hit at or before it.
+        """
+        prefilter = self._line_prefilter
+        pos = start
+        while pos <= len(text):
+            if prefilter is not None:
+                hit = prefilter.search(text, pos)
+                if hit is None:
+                    return
+                line_start = text.rfind('\n', 0, hit.start()) + 1
+                line_end = text.find('\n', hit.start())
+            else:
+                line_start = pos
+                line_end = text.find('\n', pos)
+            if line_end == -1:
+                line_end = len(text)
+            yield line_start, line_end
+            pos = line_end + 1
+    
+    @staticmethod
+    def _first_new_text_match(
+        pattern: ErrorPattern, text: str, overlap: int
+    ) -> Optional[re.Match]:
+        """Find the first whole-text match not already found in the overlap.
         
-    def detect_errors(self, text: str) -> List[ErrorDetection]:
-        """Detect all errors in the given text."""
+        A match starting inside the overlap was reported by the previous
+        scan if the pattern matches there using the overlap alone; the
+        search then moves on to the next start position.
+        """
+        match = pattern.match(text)
+        while match is not None and match.start() < overlap:
+            if pattern.pattern.match(text, match.start(), overlap) is None:
+                # Only completed by the new text
+                break
+            match = pattern.pattern.search(text, match.start() + 1)
+        return match
+    
+    def detect_errors(self, text: str, overlap: int = 0) -> List[ErrorDetection]:
+        """Detect all errors in the given text.
+        
+        Args:
+            text: Log text to scan
+            overlap: Number of leading characters already scanned by a
+                previous call. Lines that end inside this prefix are only
+                used as context so they are not reported twice.
+        """
         errors = []
-        lines = text.split('\n')
         
         # First, try to match patterns on the entire text for multiline patterns
-        for pattern in self.patterns:
-            if pattern.name == "python_syntax_error":
-                # This pattern needs multiline matching
-                match = pattern.match(text)
-                if match:
-                    # Extract line number if available
-                    line_number = None
-                    if 'line' in (pattern.extract_groups or []):
-                        try:
-                            line_idx = pattern.extract_groups.index('line')
-                            if line_idx < len(match.groups()):
-                                line_number = int(match.group(line_idx + 1))
-                        except (ValueError, IndexError):
-                            pass
-                    
-                    errors.append(ErrorDetection(
-                        error_type=pattern.name,
-                        category=pattern.category,
-                        severity=pattern.severity,
-                        line_number=line_number,
-                        description=pattern.description,
-                        suggestion=pattern.get_suggestion(match),
-                        context=match.group(0)  # Full match as context
-                    ))
+        for pattern in self._text_patterns:
+            match = self._first_new_text_match(pattern, text, overlap)
+            if match:
+                # Full match as context
+                errors.append(pattern.make_detection(match, match.group(0)))
         
-        # Then, match line by line for single-line patterns
-        for i, line in enumerate(lines):
-            for pattern in self.patterns:
-                if pattern.name == "python_syntax_error":
-                    continue  # Already handled above
-                    
+        # Then, match line by line for single-line patterns, starting at the
+        # first line that does not end inside the overlap
+        first_line = text.rfind('\n', 0, overlap) + 1
+        for line_start, line_end in self._candidate_lines(text, first_line):
+            line = text[line_start:line_end]
+            for pattern in self._line_patterns:
                 match = pattern.match(line)
                 if match:
-                    # Extract line number if available
-                    line_number = None
-                    if 'line' in (pattern.extract_groups or []):
-                        try:
-                            line_idx = pattern.extract_groups.index('line')
-                            if line_idx < len(match.groups()):
-                                line_number = int(match.group(line_idx + 1))
-                        except (ValueError, IndexError):
-                            pass
-                    
-                    # Get context (surrounding lines)
-                    context_start = max(0, i - 2)
-                    context_end = min(len(lines), i + 3)
-                    context = '\n'.join(lines[context_start:context_end])
-                    
-                    errors.append(ErrorDetection(
-                        error_type=pattern.name,
-                        category=pattern.category,
-                        severity=pattern.severity,
-                        line_number=line_number,
-                        description=pattern.description,
-                        suggestion=pattern.get_suggestion(match),
-                        context=context
-                    ))
+                    context = _line_context(text, line_start, line_end)
+                    errors.append(pattern.make_detection(match, context))
                     
         return errors
     
-    def detect_new_errors(self, text: str, session_id: str) -> List[ErrorDetection]:
+    def detect_new_errors(
+        self, text: str, session_id: str, overlap: int = 0
+    ) -> List[ErrorDetection]:
         """Detect only new errors not seen before in this session."""
-        all_errors = self.detect_errors(text)
+        # Identical content already scanned for this session can only yield
+        # errors that are in the seen set, so skip the scan entirely
+        content_key = (session_id, hash(text), overlap)
+        if content_key in self._seen_content:
+            self._seen_content.move_to_end(content_key)
+            return []
+        self._seen_content[content_key] = None
+        if len(self._seen_content) > SEEN_CONTENT_CACHE_SIZE:
+            self._seen_content.popitem(last=False)
+        
+        all_errors = self.detect_errors(text, overlap)
         
         # Get cached errors for this session
-        cached = self._line_cache.get(session_id, set())
+        cached = self._line_cache.setdefault(session_id, set())
         new_errors = []
         
         for error in all_errors:
-            # Create unique key for error
-            error_key = f"{error.error_type}:{error.line_number}:{error.context[:50]}"
+            # Fingerprint the error as a 64-bit int rather than keeping a
+            # formatted string for every error seen in the session
+            error_key = hash((error.error_type, error.line_number, error.context[:50]))
             if error_key not in cached:
                 new_errors.append(error)
                 cached.add(error_key)
         
-        self._line_cache[session_id] = cached
         return new_errors
     
     def get_suggestions_for_file(self, file_content: str, file_path: str) -> List[ErrorDetection]:
@@ -341,7 +510,7 @@ class ErrorDetector:
         
         for i, line in enumerate(lines, 1):
             # Check for hardcoded secrets
-            if re.search(r'(password|api_key|secret|token)\s*=\s*["\'][^"\']+["\']', line, re.IGNORECASE):
+            if _has_keyword(line, SECRET_KEYWORDS) and _SECRET_ASSIGNMENT.search(line):
                 suggestions.append(ErrorDetection(
                     error_type="potential_hardcoded_secret",
                     category=ErrorCategory.SECURITY,
@@ -129,11 +129,12 @@ echo ""
 SESSIONS_EXIST=false
 if [ -d "$SCRIPT_DIR/sessions" ] && [ -f "$SCRIPT_DIR/sessions/session_index.json" ]; then
     SESSION_COUNT=$(python3 -c "
-import json
+import sys
+sys.path.append('$SCRIPT_DIR')
 try:
-    with open('$SCRIPT_DIR/sessions/session_index.json', 'r') as f:
-        data = json.load(f)
-        print(len(data.get('sessions', [])))
+    from session_manager import SessionManager
+    mgr = SessionManager('$SCRIPT_DIR/sessions')
+    print(len(mgr.sessions_index.get('sessions', [])))
 except:
     print(0)
 " 2>/dev/null)
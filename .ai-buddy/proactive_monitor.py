@@ -6,14 +6,74 @@ feedback when errors are detected.
 
 import os
 import time
-import json
-import threading
+import codecs
+import multiprocessing
 from pathlib import Path
 from typing import List, Dict, Optional, Callable
-from datetime import datetime
 from collections import deque
 
-from error_patterns import ErrorDetector, ErrorDetection, ErrorSeverity, ErrorCategory
+import json_utils
+from error_patterns import (
+    ErrorDetector,
+    ErrorDetection,
+    ErrorSeverity,
+    CATEGORY_RANK,
+)
+
+
+# Trailing characters of each chunk re-scanned with the next one so that
+# multi-line errors split across polls still match
+TAIL_OVERLAP = 256
+
+# Longest unterminated last line held back until its newline arrives;
+# anything longer is scanned as it is
+MAX_PARTIAL_LINE = 64 * 1024
+
+# Size of the buffer new log bytes are read into, one piece at a time
+READ_BUFFER_SIZE = 64 * 1024
+
+
+# Formatted local time for the most recent whole second seen by _timestamp
+_timestamp_cache = [None, ""]
+
+
+def _timestamp() -> str:
+    """Current local time, formatted like datetime.now().isoformat().
+    
+    The date/time part only changes once a second, so it is formatted once
+    and reused; only the microseconds are rendered on each call.
+    """
+    second, nanos = divmod(time.time_ns(), 1_000_000_000)
+    if second != _timestamp_cache[0]:
+        _timestamp_cache[:] = [
+            second,
+            time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(second)),
+        ]
+    micros = nanos // 1000
+    if micros:
+        return f"{_timestamp_cache[1]}.{micros:06d}"
+    return _timestamp_cache[1]
+
+
+def _atomic_write(path: Path, data: bytes):
+    """Write a file so that readers never see it half-written.
+    
+    The data goes to a sibling temp file which is then renamed over the
+    target; os.replace is atomic on POSIX and Windows. The temp name
+    includes the pid because the agent and the monitoring process both
+    write these files.
+    """
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.part")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+
+
+def _priority_key(error: ErrorDetection):
+    """Sort key for prioritizing errors."""
+    return (
+        error.severity_rank,
+        CATEGORY_RANK.get(error.category, len(CATEGORY_RANK)),
+    )
 
 
 class ProactiveMonitor:
@@ -41,10 +101,21 @@ class ProactiveMonitor:
         
         self.error_detector = ErrorDetector()
         self.last_position = 0
+        self._log_handle = None
+        # Incremental decoder keeps partial multi-byte sequences between polls
+        self._decoder = codecs.getincrementaldecoder('utf-8')(errors='ignore')
+        self._log_inode = None
+        self._tail_overlap = ""
+        self._partial_line = ""
+        self._read_buffer = bytearray(READ_BUFFER_SIZE)
         self.session_id = self._extract_session_id()
+        # Most recent suggestions win: the bounded deque drops the oldest in
+        # O(1) per insert, and each batch is appended most severe first
         self.active_suggestions = deque(maxlen=max_suggestions)
         self.monitoring = False
-        self.monitor_thread = None
+        self.monitor_process = None
+        self._stop_event = None
+        self._clear_event = None
         
         # IPC files
         self.notification_file = self.sessions_dir / "buddy_notification.tmp"
@@ -59,66 +130,188 @@ class ProactiveMonitor:
         return str(int(time.time()))
     
     def start(self):
-        """Start the proactive monitoring in a background thread."""
+        """Start the proactive monitoring in a background process.
+        
+        Scanning runs in a child process so regex work on large log chunks
+        does not compete for the GIL with the agent's main loop. Results
+        reach the UI through the suggestion and notification files.
+        """
         if self.monitoring:
             return
             
         self.monitoring = True
-        self.monitor_thread = threading.Thread(target=self._monitor_loop, daemon=True)
-        self.monitor_thread.start()
+        self._stop_event = multiprocessing.Event()
+        self._clear_event = multiprocessing.Event()
+        self.monitor_process = multiprocessing.Process(
+            target=_run_monitor_process,
+            args=(
+                str(self.log_file),
+                str(self.sessions_dir),
+                self.check_interval,
+                self.max_suggestions,
+                self.session_id,
+                self._stop_event,
+                self._clear_event,
+            ),
+            daemon=True,
+        )
+        self.monitor_process.start()
         print(f"🔍 Proactive monitoring started for session {self.session_id}")
     
     def stop(self):
         """Stop the proactive monitoring."""
         self.monitoring = False
-        if self.monitor_thread:
-            self.monitor_thread.join(timeout=2)
+        if self._stop_event is not None:
+            self._stop_event.set()
+        if self.monitor_process:
+            self.monitor_process.join(timeout=2)
+            if self.monitor_process.is_alive():
+                self.monitor_process.terminate()
+                self.monitor_process.join(timeout=1)
+        self._close_log()
         self._cleanup_notifications()
         print("🔍 Proactive monitoring stopped")
     
     def _monitor_loop(self):
         """Main monitoring loop."""
-        while self.monitoring:
+        while self.monitoring and not self._stop_event.is_set():
             try:
+                # Clear requested by the process that started the monitor
+                if self._clear_event is not None and self._clear_event.is_set():
+                    self._clear_event.clear()
+                    self.clear_suggestions()
                 self._check_for_new_content()
-                time.sleep(self.check_interval)
+                self._stop_event.wait(self.check_interval)
             except Exception as e:
                 print(f"Error in monitor loop: {e}")
-                time.sleep(1)
+                self._stop_event.wait(1)
     
+    def _open_log(self, log_stat: os.stat_result):
+        """Open the log file for tailing, reusing the handle across polls.
+        
+        Args:
+            log_stat: Current stat of the log path, used to detect rotation
+        """
+        if self._log_handle is not None:
+            # Reopen if the log was rotated/replaced underneath us
+            try:
+                if os.fstat(self._log_handle.fileno()).st_ino == log_stat.st_ino:
+                    return self._log_handle
+            except OSError:
+                pass
+            self._close_log()
+
+        # Unbuffered: reads go straight into our own reusable buffer
+        self._log_handle = open(self.log_file, 'rb', buffering=0)
+        inode = os.fstat(self._log_handle.fileno()).st_ino
+        if self._log_inode is not None and inode != self._log_inode:
+            # A different file: start reading it from the beginning
+            self.last_position = 0
+            self._decoder.reset()
+            self._tail_overlap = ""
+            self._partial_line = ""
+        self._log_inode = inode
+        return self._log_handle
+
+    def _close_log(self):
+        """Close the persistent log handle."""
+        if self._log_handle is not None:
+            try:
+                self._log_handle.close()
+            except OSError:
+                pass
+            self._log_handle = None
+
+    def _read_log(self, handle, size: int) -> memoryview:
+        """Read up to size bytes at last_position into the reusable buffer.
+        
+        At most READ_BUFFER_SIZE bytes are read per call, so a large backlog
+        does not leave a buffer of its size behind.
+        """
+        size = min(size, len(self._read_buffer))
+        view = memoryview(self._read_buffer)[:size]
+        if hasattr(os, 'preadv'):
+            # Positional read: one syscall, no seek
+            count = os.preadv(handle.fileno(), [view], self.last_position)
+        else:
+            handle.seek(self.last_position)
+            count = handle.readinto(view)
+        return view[:count or 0]
+
     def _check_for_new_content(self):
         """Check log file for new content since last check."""
-        if not self.log_file.exists():
+        try:
+            log_stat = os.stat(self.log_file)
+        except FileNotFoundError:
             return
             
         try:
+            handle = self._open_log(log_stat)
+
             # Get file size
-            file_size = self.log_file.stat().st_size
+            file_size = os.fstat(handle.fileno()).st_size
             
             # If file has shrunk, reset position
             if file_size < self.last_position:
                 self.last_position = 0
+                self._decoder.reset()
+                self._tail_overlap = ""
+                self._partial_line = ""
             
             # If no new content, return
             if file_size == self.last_position:
                 return
             
-            # Read new content
-            with open(self.log_file, 'r', encoding='utf-8', errors='ignore') as f:
-                f.seek(self.last_position)
-                new_content = f.read()
-                self.last_position = f.tell()
+            # Read new content in buffer-sized pieces
+            pieces = []
+            while self.last_position < file_size:
+                with self._read_log(handle, file_size - self.last_position) as data:
+                    if not data:
+                        break
+                    self.last_position += len(data)
+                    pieces.append(self._decoder.decode(data))
+            new_content = "".join(pieces)
             
+            # Hold back a last line without its newline; scanning it now and
+            # again once complete would report its errors twice
+            new_content = self._partial_line + new_content
+            if len(new_content) > MAX_PARTIAL_LINE:
+                self._partial_line = ""
+            else:
+                end = new_content.rfind('\n') + 1
+                self._partial_line = new_content[end:]
+                new_content = new_content[:end]
+            if not new_content:
+                return
+
+            content = self._tail_overlap + new_content
             if new_content.strip():
-                self._process_new_content(new_content)
+                self._process_new_content(content, len(self._tail_overlap))
+            self._tail_overlap = self._get_tail_overlap(content)
                 
         except Exception as e:
             print(f"Error reading log file: {e}")
     
-    def _process_new_content(self, content: str):
-        """Process new log content for errors."""
+    def _get_tail_overlap(self, content: str) -> str:
+        """Get the tail of a chunk to carry into the next scan."""
+        if len(content) <= TAIL_OVERLAP:
+            return content
+        tail = content[-TAIL_OVERLAP:]
+        # Start on a line boundary so context lines are not cut in half
+        newline = tail.find('\n')
+        if 0 <= newline < len(tail) - 1:
+            tail = tail[newline + 1:]
+        return tail
+    
+    def _process_new_content(self, content: str, overlap: int = 0):
+        """Process new log content for errors.
+        
+        Args:
+            content: Log text to scan
+            overlap: Length of the prefix carried over from the previous chunk
+        """
         # Detect new errors
-        errors = self.error_detector.detect_new_errors(content, self.session_id)
+        errors = self.error_detector.detect_new_errors(content, self.session_id, overlap)
         
         if not errors:
             return
@@ -126,9 +319,10 @@ class ProactiveMonitor:
         # Filter and prioritize errors
         errors = self._prioritize_errors(errors)
         
-        # Add to active suggestions
+        # Add to active suggestions, writing the suggestions file once
         for error in errors[:self.max_suggestions]:
-            self._add_suggestion(error)
+            self._add_suggestion(error, save=False)
+        self._save_suggestions()
         
         # Notify if we have critical or multiple errors
         if any(e.severity == ErrorSeverity.CRITICAL for e in errors) or len(errors) >= 2:
@@ -137,35 +331,18 @@ class ProactiveMonitor:
     def _prioritize_errors(self, errors: List[ErrorDetection]) -> List[ErrorDetection]:
         """Prioritize errors by severity and relevance."""
         # Sort by severity (critical first) and category importance
-        severity_order = {
-            ErrorSeverity.CRITICAL: 0,
-            ErrorSeverity.ERROR: 1,
-            ErrorSeverity.WARNING: 2,
-            ErrorSeverity.INFO: 3
-        }
-        
-        category_importance = {
-            ErrorCategory.SECURITY: 0,
-            ErrorCategory.RUNTIME: 1,
-            ErrorCategory.SYNTAX: 2,
-            ErrorCategory.TYPE: 3,
-            ErrorCategory.IMPORT: 4,
-            ErrorCategory.PERFORMANCE: 5,
-            ErrorCategory.STYLE: 6
-        }
-        
-        return sorted(
-            errors,
-            key=lambda e: (
-                severity_order.get(e.severity, 999),
-                category_importance.get(e.category, 999)
-            )
-        )
+        return sorted(errors, key=_priority_key)
     
-    def _add_suggestion(self, error: ErrorDetection):
-        """Add error to active suggestions."""
+    def _add_suggestion(self, error: ErrorDetection, save: bool = True):
+        """Add error to active suggestions.
+        
+        Args:
+            error: Detected error to suggest a fix for
+            save: Whether to write the suggestions file immediately. Callers
+                adding a batch pass False and save once at the end.
+        """
         suggestion = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": _timestamp(),
             "error_type": error.error_type,
             "category": error.category.value,
             "severity": error.severity.value,
@@ -176,19 +353,19 @@ class ProactiveMonitor:
         }
         
         self.active_suggestions.append(suggestion)
-        self._save_suggestions()
+        if save:
+            self._save_suggestions()
     
     def _save_suggestions(self):
         """Save active suggestions to file."""
         try:
             suggestions_data = {
                 "session_id": self.session_id,
-                "updated": datetime.now().isoformat(),
+                "updated": _timestamp(),
                 "suggestions": list(self.active_suggestions)
             }
             
-            with open(self.suggestion_file, 'w') as f:
-                json.dump(suggestions_data, f, indent=2)
+            _atomic_write(self.suggestion_file, json_utils.dumps(suggestions_data, indent=True))
                 
         except Exception as e:
             print(f"Error saving suggestions: {e}")
@@ -201,7 +378,7 @@ class ProactiveMonitor:
             error_count = sum(1 for e in errors if e.severity == ErrorSeverity.ERROR)
             
             notification = {
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": _timestamp(),
                 "type": "error_detection",
                 "summary": f"Detected {len(errors)} issue(s)",
                 "critical_count": critical_count,
@@ -210,8 +387,7 @@ class ProactiveMonitor:
             }
             
             # Write notification
-            with open(self.notification_file, 'w') as f:
-                json.dump(notification, f)
+            _atomic_write(self.notification_file, json_utils.dumps(notification))
                 
         except Exception as e:
             print(f"Error sending notification: {e}")
@@ -228,14 +404,43 @@ class ProactiveMonitor:
     
     def get_active_suggestions(self) -> List[Dict]:
         """Get current active suggestions."""
+        if self.monitor_process is not None and self.monitoring:
+            # Suggestions are collected in the monitoring process
+            suggestions_data = ProactiveUI(str(self.sessions_dir)).get_suggestions()
+            return suggestions_data["suggestions"] if suggestions_data else []
         return list(self.active_suggestions)
     
     def clear_suggestions(self):
         """Clear all active suggestions."""
+        if self.monitor_process is not None and self.monitoring:
+            # The monitoring process holds the live suggestions and clears
+            # them before its next poll
+            self._clear_event.set()
         self.active_suggestions.clear()
         self._save_suggestions()
 
 
+def _run_monitor_process(
+    log_file: str,
+    sessions_dir: str,
+    check_interval: float,
+    max_suggestions: int,
+    session_id: str,
+    stop_event,
+    clear_event,
+):
+    """Entry point of the monitoring child process."""
+    monitor = ProactiveMonitor(log_file, sessions_dir, check_interval, max_suggestions)
+    monitor.session_id = session_id
+    monitor.monitoring = True
+    monitor._stop_event = stop_event
+    monitor._clear_event = clear_event
+    try:
+        monitor._monitor_loop()
+    finally:
+        monitor._close_log()
+
+
 class ProactiveUI:
     """UI component for displaying proactive suggestions."""
     
@@ -252,8 +457,7 @@ class ProactiveUI:
             return None
             
         try:
-            with open(self.notification_file, 'r') as f:
-                notification = json.load(f)
+            notification = json_utils.loads(self.notification_file.read_bytes())
             
             # Check if this is a new notification
             timestamp = notification.get("timestamp")
@@ -275,8 +479,7 @@ class ProactiveUI:
             return None
             
         try:
-            with open(self.suggestion_file, 'r') as f:
-                return json.load(f)
+            return json_utils.loads(self.suggestion_file.read_bytes())
         except Exception:
             return None
     
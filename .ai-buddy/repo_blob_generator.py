@@ -5,130 +5,314 @@ Creates a consolidated text file containing all project source files for AI cont
 """
 
 import os
+import re
+import shutil
+import stat
 import subprocess
 import datetime
+import functools
 import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 from pathlib import Path
-from typing import Optional, Set
+from typing import Iterable, Iterator, List, Optional, Set, Tuple
+
+# Write buffer for the blob output
+OUTPUT_BUFFER_SIZE = 1 << 20
+
+# Files at least this large are copied with os.sendfile where available
+SENDFILE_MIN_SIZE = 64 * 1024
+
+# Chunk size for the buffered copy fallback
+COPY_CHUNK_SIZE = 1 << 20
+
+# Threads reading files ahead of the blob writer, and how many files
+# they may have in flight at once
+READ_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+READ_AHEAD = 64
+
+# Bytes read from the start of a file to decide whether it is text
+TEXT_PROBE_SIZE = 4096
+
+# Extensions trusted to be text without sniffing their content
+KNOWN_TEXT_EXTENSIONS = frozenset(
+    {".py", ".md", ".txt", ".json", ".yml", ".yaml", ".toml", ".rst", ".ini", ".cfg"}
+)
+
+# Leading bytes of common binary formats
+BINARY_MAGIC = (
+    b"\x7fELF",  # ELF executable
+    b"\xca\xfe\xba\xbe",  # Java class / Mach-O fat binary
+    b"\xcf\xfa\xed\xfe",  # Mach-O
+    b"PK\x03\x04",  # zip, jar, wheel, docx
+    b"\x1f\x8b",  # gzip
+    b"\xfd7zXZ\x00",  # xz
+    b"7z\xbc\xaf\x27\x1c",  # 7-zip
+    b"%PDF-",  # PDF
+    b"\x89PNG",  # PNG
+    b"\xff\xd8\xff",  # JPEG
+    b"GIF8",  # GIF
+    b"SQLite format 3\x00",  # SQLite database
+)
+
+
+@functools.lru_cache(maxsize=8192)
+def _is_text_file_cached(path: str, inode: int, size: int, mtime_ns: int) -> bool:
+    """Sniff a file prefix for text content.
+
+    The file identity arguments only form the cache key, so an edited or
+    replaced file is probed again. Read errors propagate and are not cached.
+    """
+    # Unbuffered so the prefix is fetched with a single read call
+    with open(path, "rb", buffering=0) as f:
+        chunk = f.read(TEXT_PROBE_SIZE)
+
+    return _looks_like_text(chunk, truncated=len(chunk) == TEXT_PROBE_SIZE)
+
+
+def _looks_like_text(chunk: bytes, truncated: bool) -> bool:
+    """Decide whether the leading bytes of a file are text.
+
+    Args:
+        chunk: Leading bytes of the file
+        truncated: Whether the file may continue past the chunk
+    """
+    # Known binary formats and null bytes rule the file out early
+    if chunk.startswith(BINARY_MAGIC) or b"\x00" in chunk:
+        return False
+
+    try:
+        chunk.decode("utf-8")
+        return True
+    except UnicodeDecodeError as e:
+        # The chunk may cut a multi-byte character at the end
+        return (
+            truncated
+            and e.reason == "unexpected end of data"
+            and e.start >= len(chunk) - 3
+        )
 
 
 class RepoBlobGenerator:
     """Generates a repo-blob file containing all project source files."""
 
     # File extensions to include when git is not available
-    DEFAULT_EXTENSIONS = {
-        ".py",
-        ".txt",
-        ".md",
-        ".sh",
-        ".js",
-        ".ts",
-        ".jsx",
-        ".tsx",
-        ".html",
-        ".css",
-        ".json",
-        ".yml",
-        ".yaml",
-        ".toml",
-        ".ini",
-        ".java",
-        ".cpp",
-        ".c",
-        ".h",
-        ".hpp",
-        ".go",
-        ".rs",
-        ".rb",
-    }
-
-    # Patterns to exclude
-    EXCLUDE_PATTERNS = {
-        ".ai-buddy/",
-        "__pycache__/",
-        ".git/",
-        "node_modules/",
-        ".venv/",
-        "venv/",
-        "env/",
-        ".env",
-        ".pyc",
-    }
+    DEFAULT_EXTENSIONS = frozenset(
+        {
+            ".py",
+            ".txt",
+            ".md",
+            ".sh",
+            ".js",
+            ".ts",
+            ".jsx",
+            ".tsx",
+            ".html",
+            ".css",
+            ".json",
+            ".yml",
+            ".yaml",
+            ".toml",
+            ".ini",
+            ".java",
+            ".cpp",
+            ".c",
+            ".h",
+            ".hpp",
+            ".go",
+            ".rs",
+            ".rb",
+        }
+    )
+
+    # Extension-less file names to include when git is not available
+    SPECIAL_NAMES = frozenset({"Makefile", "Dockerfile", "Procfile", "Gemfile"})
+
+    # Directory names whose whole subtree is excluded
+    EXCLUDE_DIRS = frozenset(
+        {
+            ".ai-buddy",
+            "__pycache__",
+            ".git",
+            "node_modules",
+            ".venv",
+            "venv",
+            "env",
+            ".env",
+        }
+    )
+
+    # File name prefixes and suffixes to exclude
+    EXCLUDE_FILE_PREFIXES = (".env",)
+    EXCLUDE_FILE_SUFFIXES = (".pyc", ".env")
 
     def __init__(self, project_root: str):
         self.project_root = Path(project_root).resolve()
         self.logger = logging.getLogger(__name__)
+        self._exclude_re = self._compile_exclude_pattern()
+
+    def _compile_exclude_pattern(self) -> "re.Pattern":
+        """Fold the directory and file exclusions into one regex over a path."""
+        dirs = "|".join(map(re.escape, sorted(self.EXCLUDE_DIRS)))
+        prefixes = "|".join(map(re.escape, self.EXCLUDE_FILE_PREFIXES))
+        suffixes = "|".join(map(re.escape, self.EXCLUDE_FILE_SUFFIXES))
+        return re.compile(
+            rf"(?:^|/)(?:{dirs})/|(?:^|/)(?:{prefixes})[^/]*\Z|(?:{suffixes})\Z"
+        )
 
     def is_text_file(self, file_path: Path) -> bool:
         """Check if a file is likely a text file (not binary)."""
         try:
-            # Try to read first 1024 bytes
-            with open(file_path, "rb") as f:
-                chunk = f.read(1024)
-
-            # Check for null bytes (common in binary files)
-            if b"\x00" in chunk:
-                return False
-
-            # Try to decode as UTF-8
-            try:
-                chunk.decode("utf-8")
-                return True
-            except UnicodeDecodeError:
-                return False
-
+            st = os.stat(file_path)
+            return _is_text_file_cached(
+                str(file_path), st.st_ino, st.st_size, st.st_mtime_ns
+            )
         except Exception:
             return False
 
+    def should_exclude_dir(self, name: str) -> bool:
+        """Check if a directory (by base name) should be skipped entirely."""
+        return name in self.EXCLUDE_DIRS
+
+    def should_exclude_file(self, name: str) -> bool:
+        """Check if a file (by base name) should be excluded."""
+        return name.startswith(self.EXCLUDE_FILE_PREFIXES) or name.endswith(
+            self.EXCLUDE_FILE_SUFFIXES
+        )
+
     def should_exclude(self, file_path: str) -> bool:
-        """Check if a file should be excluded based on patterns."""
-        for pattern in self.EXCLUDE_PATTERNS:
-            if pattern in file_path:
-                return True
-        return False
+        """Check if a relative file path should be excluded."""
+        return self._exclude_re.search(file_path.replace(os.sep, "/")) is not None
 
     def get_git_files(self) -> Optional[Set[str]]:
-        """Get list of files tracked by git."""
-        try:
-            # Check if we're in a git repository
-            subprocess.run(
-                ["git", "rev-parse", "--git-dir"],
-                cwd=self.project_root,
-                capture_output=True,
-                check=True,
-            )
+        """
+        Get list of files tracked by git, plus untracked files not ignored.
 
-            # Get list of tracked files
+        This is the only git process a generate() run starts; file contents
+        come from the working tree, not from git objects.
+        """
+        try:
+            # A single ls-files call; it fails outside a git repository
             result = subprocess.run(
-                ["git", "ls-files"],
+                [
+                    "git",
+                    "ls-files",
+                    "-z",
+                    "--cached",
+                    "--others",
+                    "--exclude-standard",
+                ],
                 cwd=self.project_root,
                 capture_output=True,
-                text=True,
-                check=True,
             )
+        except (subprocess.CalledProcessError, OSError):
+            return None
 
-            return set(result.stdout.strip().split("\n")) if result.stdout else set()
-
-        except subprocess.CalledProcessError:
+        if result.returncode != 0:
             return None
 
-    def find_files_by_extension(self) -> Set[Path]:
-        """Find files by extension when git is not available."""
-        files = set()
+        return {os.fsdecode(name) for name in result.stdout.split(b"\0") if name}
+
+    def find_files_by_extension(
+        self, cancel: Optional[threading.Event] = None
+    ) -> Set[Path]:
+        """Find files by extension when git is not available.
+
+        Args:
+            cancel: Optional event that stops the walk early when set
+        """
+        return {Path(path) for path, _ in self._walk_files(cancel)}
+
+    def _walk_files(
+        self, cancel: Optional[threading.Event] = None
+    ) -> Iterator[Tuple[str, str]]:
+        """
+        Walk the project for files with a wanted extension or name.
+
+        Yields:
+            (path, relative_name) for each file, with relative_name using
+            "/" separators
+        """
+        stack = [(str(self.project_root), "")]
+        extensions = self.DEFAULT_EXTENSIONS
+        special_names = self.SPECIAL_NAMES
+
+        while stack:
+            if cancel is not None and cancel.is_set():
+                return
+
+            dir_path, rel_dir = stack.pop()
+            try:
+                with os.scandir(dir_path) as entries:
+                    for entry in entries:
+                        name = entry.name
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                # Prune excluded trees instead of walking them
+                                if not self.should_exclude_dir(name):
+                                    stack.append((entry.path, rel_dir + name + "/"))
+                                continue
+                        except OSError:
+                            continue
+
+                        # Leading dots mark hidden files, not extensions
+                        dot = name.rfind(".")
+                        if dot > 0:
+                            wanted = name[dot:] in extensions
+                        else:
+                            wanted = name in special_names
+
+                        try:
+                            if (
+                                wanted
+                                and entry.is_file()
+                                and not self.should_exclude_file(name)
+                            ):
+                                yield entry.path, rel_dir + name
+                        except OSError:
+                            continue
+            except OSError:
+                continue
+
+    def discover_files(
+        self, prefer_git: bool = True
+    ) -> Tuple[Optional[Set[str]], Optional[List[Tuple[str, str]]]]:
+        """
+        Find the files to include in the blob.
 
-        for ext in self.DEFAULT_EXTENSIONS:
-            for file_path in self.project_root.rglob(f"*{ext}"):
-                if not self.should_exclude(str(file_path)):
-                    files.add(file_path)
+        When prefer_git is set, the extension walk starts in a background
+        thread while git runs, so a project without git does not wait for
+        git to fail before walking. The git listing still wins whenever it
+        succeeds and the walk is then cancelled.
 
-        return files
+        Args:
+            prefer_git: Use the git file list when available
 
-    def generate(self, output_path: str) -> bool:
+        Returns:
+            (git_files, None) when git listed the files, otherwise
+            (None, walked_files) with (path, relative_name) pairs
+        """
+        if not prefer_git:
+            return None, list(self._walk_files())
+
+        cancel = threading.Event()
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            walk = pool.submit(lambda: list(self._walk_files(cancel)))
+            git_files = self.get_git_files()
+            if git_files is not None:
+                cancel.set()
+                return git_files, None
+            return None, walk.result()
+
+    def generate(self, output_path: str, prefer_git: bool = True) -> bool:
         """
         Generate the repo-blob file.
 
         Args:
             output_path: Path where the repo-blob file should be written
+            prefer_git: Use the git file list when available
 
         Returns:
             True if successful, False otherwise
@@ -136,14 +320,18 @@ class RepoBlobGenerator:
         try:
             self.logger.info(f"Generating repo-blob from: {self.project_root}")
 
-            with open(output_path, "w", encoding="utf-8") as output:
+            with open(output_path, "wb", buffering=OUTPUT_BUFFER_SIZE) as output:
                 # Write header
-                output.write(f"=== PROJECT: {self.project_root.name} ===\n")
-                output.write(f"=== Generated: {datetime.datetime.now()} ===\n")
-                output.write(f"=== Root: {self.project_root} ===\n\n")
+                output.write(
+                    _encode(
+                        f"=== PROJECT: {self.project_root.name} ===\n"
+                        f"=== Generated: {datetime.datetime.now()} ===\n"
+                        f"=== Root: {self.project_root} ===\n\n"
+                    )
+                )
 
                 # Get files to include
-                git_files = self.get_git_files()
+                git_files, files = self.discover_files(prefer_git)
 
                 if git_files is not None:
                     # Use git-tracked files
@@ -151,23 +339,26 @@ class RepoBlobGenerator:
                         f"Using git to find files ({len(git_files)} tracked files)"
                     )
 
-                    for file_name in sorted(git_files):
-                        if self.should_exclude(file_name):
-                            continue
-
-                        file_path = self.project_root / file_name
-                        if file_path.is_file() and self.is_text_file(file_path):
-                            self._add_file_to_blob(output, file_path, file_name)
+                    # Filtering happens lazily as the writer pulls jobs
+                    jobs = (
+                        (self.project_root / file_name, file_name, True)
+                        for file_name in sorted(git_files)
+                        if not self.should_exclude(file_name)
+                    )
                 else:
                     # Fall back to extension-based search
                     self.logger.info(
                         "No git repository found. Using extension-based file search."
                     )
 
-                    files = self.find_files_by_extension()
-                    for file_path in sorted(files):
-                        relative_path = file_path.relative_to(self.project_root)
-                        self._add_file_to_blob(output, file_path, str(relative_path))
+                    # Same order as sorting the paths component by component
+                    files.sort(key=lambda item: item[1].split("/"))
+                    jobs = (
+                        (Path(file_path), relative_name, False)
+                        for file_path, relative_name in files
+                    )
+
+                self._write_files(output, jobs)
 
                 self.logger.info(f"Repo-blob created at: {output_path}")
                 return True
@@ -176,22 +367,141 @@ class RepoBlobGenerator:
             self.logger.error(f"Error generating repo-blob: {e}")
             return False
 
-    def _add_file_to_blob(self, output, file_path: Path, relative_name: str):
-        """Add a single file's content to the blob."""
-        try:
-            output.write(f"--- START FILE: {relative_name} ---\n")
+    def _write_files(self, output, jobs: Iterable[Tuple[Path, str, bool]]):
+        """
+        Write files to the blob in order while a thread pool reads ahead.
 
-            with open(file_path, "r", encoding="utf-8", errors="replace") as f:
+        Args:
+            output: Binary output stream
+            jobs: (file_path, relative_name, check_text) in output order;
+                check_text skips files that are missing or not text
+        """
+        jobs = iter(jobs)
+        pending = deque()
+
+        with ThreadPoolExecutor(max_workers=READ_WORKERS) as pool:
+
+            def submit(batch):
+                for file_path, relative_name, check_text in batch:
+                    future = pool.submit(self._prefetch_file, file_path, check_text)
+                    pending.append((file_path, relative_name, future))
+
+            submit(islice(jobs, READ_AHEAD))
+            while pending:
+                file_path, relative_name, future = pending.popleft()
+                submit(islice(jobs, 1))
+                include, content = future.result()
+                if include:
+                    self._add_file_to_blob(output, file_path, relative_name, content)
+
+    def _prefetch_file(
+        self, file_path: Path, check_text: bool
+    ) -> Tuple[bool, Optional[bytes]]:
+        """
+        Read a file ahead of the writer.
+
+        Small files are opened once: the text check runs on the bytes
+        already read instead of probing the file separately. Files with a
+        well-known text extension skip the content check entirely.
+
+        Returns:
+            (include, content); content is None when the writer should copy
+            the file itself (large files, or a read error to report)
+        """
+        probe = check_text and file_path.suffix.lower() not in KNOWN_TEXT_EXTENSIONS
+        try:
+            st = os.stat(file_path)
+            if check_text and not stat.S_ISREG(st.st_mode):
+                return False, None
+            if st.st_size >= SENDFILE_MIN_SIZE:
+                if probe and not self.is_text_file(file_path):
+                    return False, None
+                return True, None
+
+            with open(file_path, "rb", buffering=0) as f:
                 content = f.read()
-                output.write(content)
-                if not content.endswith("\n"):
-                    output.write("\n")
+        except OSError:
+            return not check_text, None
+
+        if probe and not _looks_like_text(
+            content[:TEXT_PROBE_SIZE], truncated=len(content) > TEXT_PROBE_SIZE
+        ):
+            return False, None
+        return True, content
+
+    def _add_file_to_blob(
+        self,
+        output,
+        file_path: Path,
+        relative_name: str,
+        content: Optional[bytes] = None,
+    ):
+        """Add a single file's content to the blob.
+
+        File bytes are copied as-is, without decoding and re-encoding them.
+        Pass content when the file has already been read.
+        """
+        if content is not None:
+            output.write(
+                _encode(f"--- START FILE: {relative_name} ---\n")
+                + content
+                + (b"" if content.endswith(b"\n") else b"\n")
+                + _encode(f"--- END FILE: {relative_name} ---\n\n")
+            )
+            return
 
-            output.write(f"--- END FILE: {relative_name} ---\n\n")
+        try:
+            output.write(_encode(f"--- START FILE: {relative_name} ---\n"))
+
+            with open(file_path, "rb", buffering=0) as f:
+                size = os.fstat(f.fileno()).st_size
+                if size >= SENDFILE_MIN_SIZE and hasattr(os, "sendfile"):
+                    last = _sendfile_to(output, f, size)
+                else:
+                    content = f.read()
+                    output.write(content)
+                    last = content[-1:]
+                if last != b"\n":
+                    output.write(b"\n")
+
+            output.write(_encode(f"--- END FILE: {relative_name} ---\n\n"))
 
         except Exception as e:
-            output.write(f"[Could not read file: {e}]\n")
-            output.write(f"--- END FILE: {relative_name} ---\n\n")
+            output.write(_encode(f"[Could not read file: {e}]\n"))
+            output.write(_encode(f"--- END FILE: {relative_name} ---\n\n"))
+
+
+def _encode(text: str) -> bytes:
+    """Encode blob markup, keeping undecodable file name bytes intact."""
+    return text.encode("utf-8", "surrogateescape")
+
+
+def _sendfile_to(output, src, size: int) -> bytes:
+    """Copy a file into the buffered output in kernel space.
+
+    Falls back to a buffered copy for whatever sendfile could not send.
+
+    Returns:
+        The last byte of the file (empty if nothing was copied)
+    """
+    # Anything still buffered must hit the file before sendfile appends
+    output.flush()
+    out_fd, in_fd = output.fileno(), src.fileno()
+    offset = 0
+    try:
+        while offset < size:
+            sent = os.sendfile(out_fd, in_fd, offset, size - offset)
+            if sent == 0:
+                break
+            offset += sent
+    except OSError:
+        pass
+
+    if offset < size:
+        src.seek(offset)
+        shutil.copyfileobj(src, output, COPY_CHUNK_SIZE)
+
+    return os.pread(in_fd, 1, size - 1) if size else b""
 
 
 def generate_repo_blob(project_root: str, output_path: str) -> bool:
@@ -1,37 +1,166 @@
 # session_manager.py
-import json
+import atexit
+import heapq
 import os
 from datetime import datetime
 from typing import List, Dict, Optional
 
+import json_utils
+
+# Logged changes kept before they are folded into the index file
+COMPACT_THRESHOLD = 100
+
 
 class SessionManager:
     """Manages AI Buddy sessions for persistence and resumption."""
 
-    def __init__(self, sessions_dir: str):
+    def __init__(self, sessions_dir: str, autosave: bool = True):
+        """
+        Initialize the session manager.
+
+        Args:
+            sessions_dir: Directory holding the session index
+            autosave: Write each change as soon as it is made. When False,
+                changes are kept in memory until flush() or interpreter exit.
+        """
         self.sessions_dir = sessions_dir
         self.index_file = os.path.join(sessions_dir, "session_index.json")
-        self.sessions_index: Dict = self._load_index()
+        self.events_file = os.path.join(sessions_dir, "session_events.jsonl")
+        self.autosave = autosave
+        self._sessions_index: Optional[Dict] = None
+        self._by_id: Dict[str, Dict] = {}
+        self._pending_events: List[Dict] = []
+        self._logged_events = 0
+
+        if not autosave:
+            atexit.register(self.flush)
+
+    @property
+    def sessions_index(self) -> Dict:
+        """The session index, read from disk on first use."""
+        self._ensure_loaded()
+        return self._sessions_index
+
+    def _ensure_loaded(self):
+        """Read the index and build the by-id lookup if not done yet."""
+        if self._sessions_index is None:
+            self._sessions_index = self._load_index()
 
     def _load_index(self) -> Dict:
-        """Load the session index from file."""
+        """Load the session index snapshot and replay the event log over it."""
+        index = self._load_snapshot()
+        self._by_id = {}
+        for session in index["sessions"]:
+            self._by_id.setdefault(session.get("id"), session)
+        self._logged_events = self._replay_events(index)
+        return index
+
+    def _load_snapshot(self) -> Dict:
+        """Load the compacted session index from file."""
         if os.path.exists(self.index_file):
             try:
-                with open(self.index_file, "r", encoding="utf-8") as f:
-                    return json.load(f)
+                with open(self.index_file, "rb") as f:
+                    return json_utils.loads(f.read())
             except Exception:
                 return {"sessions": []}
         return {"sessions": []}
 
+    def _replay_events(self, index: Dict) -> int:
+        """Apply logged changes that are newer than the snapshot.
+
+        Returns:
+            Number of lines in the event log
+        """
+        try:
+            with open(self.events_file, "rb") as f:
+                lines = f.read().splitlines()
+        except OSError:
+            return 0
+
+        for line in lines:
+            try:
+                event = json_utils.loads(line)
+            except ValueError:
+                # Torn write from an interrupted process
+                continue
+            self._apply_event(index, self._by_id, event)
+
+        return len(lines)
+
+    @staticmethod
+    def _apply_event(index: Dict, by_id: Dict, event: Dict):
+        """Apply one logged change. Replaying an event twice is harmless."""
+        op = event.get("op")
+        if op == "create":
+            session = event["session"]
+            if session["id"] not in by_id:
+                index["sessions"].append(session)
+                by_id[session["id"]] = session
+        elif op == "access":
+            session = by_id.get(event["id"])
+            if session is not None:
+                session["last_accessed"] = event["last_accessed"]
+
     def _save_index(self):
-        """Save the session index to file."""
+        """Save the full session index to file and clear the event log."""
         try:
             os.makedirs(self.sessions_dir, exist_ok=True)
-            with open(self.index_file, "w", encoding="utf-8") as f:
-                json.dump(self.sessions_index, f, indent=2)
+            tmp_file = self.index_file + ".tmp"
+            with open(tmp_file, "wb") as f:
+                f.write(json_utils.dumps(self.sessions_index))
+            os.replace(tmp_file, self.index_file)
+            self._pending_events.clear()
+
+            # The snapshot now holds every logged change
+            with open(self.events_file, "wb"):
+                pass
+            self._logged_events = 0
         except Exception as e:
             print(f"Warning: Could not save session index: {e}")
 
+    def _append_events(self):
+        """Append pending changes to the event log."""
+        try:
+            os.makedirs(self.sessions_dir, exist_ok=True)
+            lines = b"".join(
+                json_utils.dumps(event) + b"\n" for event in self._pending_events
+            )
+            with open(self.events_file, "a+b") as f:
+                # A torn last line from an interrupted write must not swallow
+                # the first new event, so start it on a fresh line
+                if f.seek(0, os.SEEK_END) > 0:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        lines = b"\n" + lines
+                f.write(lines)
+            self._logged_events += len(self._pending_events)
+            self._pending_events.clear()
+        except Exception as e:
+            print(f"Warning: Could not append to session event log: {e}")
+
+    def _record(self, event: Dict):
+        """Record a change to the index, saving it now if autosave is on."""
+        self._pending_events.append(event)
+        if self.autosave:
+            self.flush()
+
+    def flush(self):
+        """Persist changes made since the last save.
+
+        Changes are appended to the event log, which is folded into the
+        index file once it reaches COMPACT_THRESHOLD entries.
+        """
+        if not self._pending_events:
+            return
+
+        if (
+            not os.path.exists(self.index_file)
+            or self._logged_events + len(self._pending_events) >= COMPACT_THRESHOLD
+        ):
+            self._save_index()
+        else:
+            self._append_events()
+
     def create_session(self, session_id: str, project_root: str) -> Dict:
         """Create a new session entry."""
         session = {
@@ -47,35 +176,37 @@ class SessionManager:
 
         # Add to index
         self.sessions_index["sessions"].append(session)
-        self._save_index()
+        self._by_id.setdefault(session_id, session)
+        self._record({"op": "create", "session": session})
 
         return session
 
     def get_session(self, session_id: str) -> Optional[Dict]:
         """Get a specific session by ID."""
-        for session in self.sessions_index["sessions"]:
-            if session["id"] == session_id:
-                return session
-        return None
+        self._ensure_loaded()
+        return self._by_id.get(session_id)
 
     def update_session_access(self, session_id: str):
         """Update the last accessed time for a session."""
-        for session in self.sessions_index["sessions"]:
-            if session["id"] == session_id:
-                session["last_accessed"] = datetime.now().isoformat()
-                self._save_index()
-                break
+        session = self.get_session(session_id)
+        if session is not None:
+            session["last_accessed"] = datetime.now().isoformat()
+            self._record(
+                {
+                    "op": "access",
+                    "id": session_id,
+                    "last_accessed": session["last_accessed"],
+                }
+            )
 
     def list_recent_sessions(self, limit: int = 10) -> List[Dict]:
         """List recent sessions sorted by last access time."""
-        sessions = self.sessions_index["sessions"]
-        # Sort by last_accessed descending
-        sorted_sessions = sorted(
-            sessions,
+        # Newest first; nlargest keeps the order of sorted(reverse=True)
+        return heapq.nlargest(
+            limit,
+            self.sessions_index["sessions"],
             key=lambda x: x.get("last_accessed", x.get("created", "")),
-            reverse=True,
         )
-        return sorted_sessions[:limit]
 
     def format_session_list(self) -> str:
         """Format session list for display."""
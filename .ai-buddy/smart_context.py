@@ -4,15 +4,146 @@ Intelligently selects and prioritizes files based on user queries.
 """
 
 import os
+import heapq
 import re
+import time
 import logging
+from bisect import bisect_right
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from operator import itemgetter
 from pathlib import Path
-from typing import List, Dict, Tuple, Optional
+from typing import Iterable, Iterator, List, Dict, Tuple, Optional
 from datetime import datetime
 from dataclasses import dataclass
 from enum import Enum
 import subprocess
 
+try:
+    import pygit2
+except ImportError:  # pragma: no cover - depends on the environment
+    pygit2 = None
+
+
+# Directories skipped when walking a project without git
+WALK_EXCLUDE_DIRS = frozenset({".git", "__pycache__", "node_modules", ".venv", "venv"})
+
+# Distinct queries whose analysis each QueryAnalyzer keeps
+ANALYSIS_CACHE_SIZE = 256
+
+# Selected files read ahead of the context builder
+READ_WORKERS = 8
+READ_AHEAD = 8
+
+# Common words dropped from query keywords
+STOP_WORDS = frozenset(
+    {
+        "the",
+        "is",
+        "at",
+        "which",
+        "on",
+        "a",
+        "an",
+        "and",
+        "or",
+        "but",
+        "in",
+        "with",
+        "to",
+        "for",
+        "of",
+        "as",
+        "by",
+        "that",
+        "this",
+        "it",
+        "from",
+        "be",
+        "are",
+        "been",
+        "being",
+        "have",
+        "has",
+        "had",
+        "do",
+        "does",
+        "did",
+        "will",
+        "would",
+        "could",
+        "should",
+        "may",
+        "might",
+        "must",
+        "can",
+        "need",
+        "my",
+        "our",
+        "we",
+        "i",
+        "me",
+    }
+)
+
+# Source file extensions recognised as technical terms
+SOURCE_EXTENSIONS = frozenset(
+    {"py", "js", "ts", "jsx", "tsx", "java", "cpp", "c", "h", "go", "rs"}
+)
+
+# Query tokenizing patterns
+_WORD_RE = re.compile(r"\b\w+\b")
+_IDENTIFIER_RE = re.compile(r"\b([a-z_]+[A-Z]\w+|[a-z]+_[a-z_]+)\b")
+_EXTENSION_RE = re.compile(r"\b\w+\.(\w+)\b")
+_CLASS_NAME_RE = re.compile(r"\b[A-Z][a-z]+[A-Z]\w*\b")
+_IMPORT_RE = re.compile(r"\b(import|from|require)\s+(\S+)")
+_DOUBLE_QUOTED_RE = re.compile(r'"([^"]+)"')
+_SINGLE_QUOTED_RE = re.compile(r"'([^']+)'")
+_FILE_PATH_RE = re.compile(r"[\w/\\.-]+\.\w+")
+
+# An intent pattern that is only a list of whole words
+_WORD_ALTERNATION_RE = re.compile(r"\\b\((\w+(?:\|\w+)*)\)\\b")
+
+# Line breaks in file content
+_NEWLINE_RE = re.compile("\n")
+
+
+def _compile_intent_pattern(pattern: str):
+    r"""Compile an intent pattern for matching.
+
+    Patterns that only list whole words, like r"\b(fix|bug)\b", become a
+    frozenset of the words and are tested against the query's word set,
+    so every such pattern is checked against a single tokenization of the
+    query. Anything else (phrases, hyphenated terms) stays a regex.
+    """
+    match = _WORD_ALTERNATION_RE.fullmatch(pattern)
+    if match:
+        return frozenset(match.group(1).split("|"))
+    return re.compile(pattern)
+
+
+def _line_starts(text: str) -> List[int]:
+    """Offsets at which each line of text starts."""
+    return [0] + [m.end() for m in _NEWLINE_RE.finditer(text)]
+
+
+def _matching_lines(text: str, needle: str, line_starts: List[int]) -> Iterator[int]:
+    """Yield the index of each line of text that contains needle."""
+    if "\n" in needle:
+        return
+    if not needle:
+        yield from range(len(line_starts))
+        return
+
+    pos = text.find(needle)
+    while pos != -1:
+        line = bisect_right(line_starts, pos) - 1
+        yield line
+        if line + 1 == len(line_starts):
+            return
+        pos = text.find(needle, line_starts[line + 1])
+
 
 class QueryIntent(str, Enum):
     """Types of user query intents."""
@@ -75,18 +206,52 @@ class QueryAnalyzer:
         ],
     }
 
+    # INTENT_PATTERNS compiled once when the class is defined
+    _INTENT_MATCHERS = {
+        intent: [_compile_intent_pattern(pattern) for pattern in patterns]
+        for intent, patterns in INTENT_PATTERNS.items()
+    }
+
     def __init__(self):
         self.logger = logging.getLogger(__name__)
+        # Recent analyses by query, least recently used first. A plain dict
+        # on the instance rather than lru_cache around a bound method, which
+        # would form a reference cycle through self
+        self._analysis_cache = OrderedDict()
 
     def analyze(self, query: str) -> Tuple[QueryIntent, List[str], Dict[str, float]]:
         """
         Analyze a user query.
 
+        Repeated queries are answered from a cache. The returned list and
+        dict are fresh copies, so callers may modify them.
+
         Returns:
             - Intent of the query
             - List of keywords
             - Dictionary of technical terms with confidence scores
         """
+        cached = self._analysis_cache.get(query)
+        if cached is None:
+            cached = self._analyze_query(query)
+            self._analysis_cache[query] = cached
+            if len(self._analysis_cache) > ANALYSIS_CACHE_SIZE:
+                self._analysis_cache.popitem(last=False)
+        else:
+            self._analysis_cache.move_to_end(query)
+
+        intent, keywords, tech_terms = cached
+        keywords = list(keywords)
+        tech_terms = dict(tech_terms)
+
+        self.logger.info(f"Query analysis - Intent: {intent}, Keywords: {keywords[:5]}")
+
+        return intent, keywords, tech_terms
+
+    def _analyze_query(
+        self, query: str
+    ) -> Tuple[QueryIntent, Tuple[str, ...], Tuple[Tuple[str, float], ...]]:
+        """Analyze a query into immutable results that are safe to cache."""
         query_lower = query.lower()
 
         # Detect intent
@@ -98,18 +263,20 @@ class QueryAnalyzer:
         # Extract technical terms
         tech_terms = self._extract_technical_terms(query)
 
-        self.logger.info(f"Query analysis - Intent: {intent}, Keywords: {keywords[:5]}")
-
-        return intent, keywords, tech_terms
+        return intent, tuple(keywords), tuple(tech_terms.items())
 
     def _detect_intent(self, query_lower: str) -> QueryIntent:
         """Detect the primary intent of the query."""
         intent_scores = {}
+        words = set(_WORD_RE.findall(query_lower))
 
-        for intent, patterns in self.INTENT_PATTERNS.items():
+        for intent, matchers in self._INTENT_MATCHERS.items():
             score = 0
-            for pattern in patterns:
-                if re.search(pattern, query_lower):
+            for matcher in matchers:
+                if isinstance(matcher, frozenset):
+                    if not words.isdisjoint(matcher):
+                        score += 1
+                elif matcher.search(query_lower):
                     score += 1
             intent_scores[intent] = score
 
@@ -120,65 +287,16 @@ class QueryAnalyzer:
 
     def _extract_keywords(self, query: str) -> List[str]:
         """Extract important keywords from the query."""
-        # Remove common words
-        stop_words = {
-            "the",
-            "is",
-            "at",
-            "which",
-            "on",
-            "a",
-            "an",
-            "and",
-            "or",
-            "but",
-            "in",
-            "with",
-            "to",
-            "for",
-            "of",
-            "as",
-            "by",
-            "that",
-            "this",
-            "it",
-            "from",
-            "be",
-            "are",
-            "been",
-            "being",
-            "have",
-            "has",
-            "had",
-            "do",
-            "does",
-            "did",
-            "will",
-            "would",
-            "could",
-            "should",
-            "may",
-            "might",
-            "must",
-            "can",
-            "need",
-            "my",
-            "our",
-            "we",
-            "i",
-            "me",
-        }
-
-        # Tokenize and filter
-        words = re.findall(r"\b\w+\b", query.lower())
-        keywords = [w for w in words if w not in stop_words and len(w) > 2]
+        # Tokenize and drop common words
+        words = _WORD_RE.findall(query.lower())
+        keywords = [w for w in words if w not in STOP_WORDS and len(w) > 2]
 
         # Also extract quoted strings
-        quoted = re.findall(r'"([^"]+)"', query) + re.findall(r"'([^']+)'", query)
+        quoted = _DOUBLE_QUOTED_RE.findall(query) + _SINGLE_QUOTED_RE.findall(query)
         keywords.extend(quoted)
 
         # Extract file paths
-        paths = re.findall(r"[\w/\\.-]+\.\w+", query)
+        paths = _FILE_PATH_RE.findall(query)
         keywords.extend(paths)
 
         return list(set(keywords))  # Remove duplicates
@@ -188,33 +306,21 @@ class QueryAnalyzer:
         tech_terms = {}
 
         # Function/method names (camelCase or snake_case)
-        for match in re.finditer(r"\b([a-z_]+[A-Z]\w+|[a-z]+_[a-z_]+)\b", query):
+        for match in _IDENTIFIER_RE.finditer(query):
             tech_terms[match.group(1)] = 0.8
 
         # File extensions
-        for match in re.finditer(r"\b\w+\.(\w+)\b", query):
+        for match in _EXTENSION_RE.finditer(query):
             ext = match.group(1)
-            if ext in [
-                "py",
-                "js",
-                "ts",
-                "jsx",
-                "tsx",
-                "java",
-                "cpp",
-                "c",
-                "h",
-                "go",
-                "rs",
-            ]:
+            if ext in SOURCE_EXTENSIONS:
                 tech_terms[f"*.{ext}"] = 0.9
 
         # Class names (PascalCase)
-        for match in re.finditer(r"\b[A-Z][a-z]+[A-Z]\w*\b", query):
+        for match in _CLASS_NAME_RE.finditer(query):
             tech_terms[match.group(0)] = 0.7
 
         # Module/package names
-        for match in re.finditer(r"\b(import|from|require)\s+(\S+)", query):
+        for match in _IMPORT_RE.finditer(query):
             tech_terms[match.group(2)] = 0.9
 
         return tech_terms
@@ -227,6 +333,13 @@ class FileScorer:
         self.project_root = Path(project_root)
         self.logger = logging.getLogger(__name__)
         self._file_cache = {}  # Cache file metadata
+        self._git_index_path: Optional[Path] = None
+        self._git_index_searched = False
+        self._git_files_cache: Optional[Tuple[Tuple[int, int, int], List[Path]]] = None
+
+    def invalidate_cache(self):
+        """Forget the cached git file listing."""
+        self._git_files_cache = None
 
     def score_files(
         self,
@@ -240,64 +353,200 @@ class FileScorer:
 
         Returns top scored files up to max_files.
         """
-        scored_files = []
+        # Keep only the best max_files while scoring; nlargest returns the
+        # same files in the same order as sorted(reverse=True)[:max_files]
+        top = heapq.nlargest(
+            max_files,
+            self._iter_scored_files(intent, keywords, tech_terms),
+            key=itemgetter(0),
+        )
+
+        # Build results only for the files that are returned
+        return [
+            FileRelevance(
+                path=str(file_path.relative_to(self.project_root)),
+                score=score,
+                reasons=reasons,
+                size=file_stat.st_size,
+                last_modified=datetime.fromtimestamp(file_stat.st_mtime),
+            )
+            for score, file_path, reasons, file_stat in top
+        ]
+
+    def _iter_scored_files(
+        self,
+        intent: QueryIntent,
+        keywords: List[str],
+        tech_terms: Dict[str, float],
+    ) -> Iterator[Tuple[float, Path, List[str], os.stat_result]]:
+        """Yield (score, path, reasons, stat) for every file scoring above zero."""
+        # One clock read for the whole pass, shared by every recency check
+        now = time.time()
 
         # Get all text files in project
-        for file_path in self._get_project_files():
+        for file_path, entry in self._get_project_files():
+            # One stat per file, shared by recency scoring and the result
+            try:
+                file_stat = entry.stat() if entry is not None else file_path.stat()
+            except OSError as e:
+                file_stat = None
+                stat_error = e
+
             score, reasons = self._score_single_file(
-                file_path, intent, keywords, tech_terms
+                file_path, intent, keywords, tech_terms, file_stat, now
             )
 
             if score > 0:
-                try:
-                    stat = file_path.stat()
-                    scored_files.append(
-                        FileRelevance(
-                            path=str(file_path.relative_to(self.project_root)),
-                            score=score,
-                            reasons=reasons,
-                            size=stat.st_size,
-                            last_modified=datetime.fromtimestamp(stat.st_mtime),
-                        )
+                if file_stat is None:
+                    self.logger.warning(
+                        f"Could not stat file {file_path}: {stat_error}"
                     )
-                except Exception as e:
-                    self.logger.warning(f"Could not stat file {file_path}: {e}")
+                    continue
+                yield score, file_path, reasons, file_stat
+
+    def _get_project_files(self) -> List[Tuple[Path, Optional[os.DirEntry]]]:
+        """
+        Get all relevant files in the project.
 
-        # Sort by score descending
-        scored_files.sort(key=lambda x: x.score, reverse=True)
+        Returns:
+            (path, entry) pairs; entry is the directory entry when the files
+            were found by walking the tree, so its cached stat can be reused
+        """
+        # Reuse the last git listing while the git index is unchanged
+        index_key = self._git_index_key()
+        if (
+            index_key is not None
+            and self._git_files_cache is not None
+            and self._git_files_cache[0] == index_key
+        ):
+            return [(path, None) for path in self._git_files_cache[1]]
+
+        # Read the index in-process when libgit2 bindings are installed
+        files = self._list_git_index()
 
-        return scored_files[:max_files]
+        # Use git if available
+        if files is None:
+            try:
+                result = subprocess.run(
+                    ["git", "ls-files"],
+                    cwd=self.project_root,
+                    capture_output=True,
+                    text=True,
+                    check=True,
+                )
+            except subprocess.CalledProcessError:
+                # Fallback to walking directory
+                return self._walk_project_files()
+
+            files = [
+                self.project_root / line
+                for line in result.stdout.strip().split("\n")
+                if line
+            ]
+
+        if index_key is not None:
+            self._git_files_cache = (index_key, list(files))
+
+        return [(path, None) for path in files]
+
+    def _walk_project_files(self) -> List[Tuple[Path, os.DirEntry]]:
+        """
+        Walk the project directory when git cannot list its files.
 
-    def _get_project_files(self) -> List[Path]:
-        """Get all relevant files in the project."""
+        Files are listed in the same order as os.walk: a directory's files
+        before its subdirectories, symlinked directories not followed.
+        """
         files = []
 
-        # Use git if available
+        def walk(directory: str):
+            try:
+                with os.scandir(directory) as it:
+                    entries = list(it)
+            except OSError:
+                return
+
+            subdirs = []
+            for entry in entries:
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+
+                if is_dir:
+                    if entry.name not in WALK_EXCLUDE_DIRS and not entry.is_symlink():
+                        subdirs.append(entry.path)
+                elif not entry.name.startswith("."):
+                    files.append((Path(entry.path), entry))
+
+            for subdir in subdirs:
+                walk(subdir)
+
+        walk(str(self.project_root))
+        return files
+
+    def _list_git_index(self) -> Optional[List[Path]]:
+        """
+        List tracked files under the project root through pygit2.
+
+        Returns:
+            Paths of the index entries below project_root, or None when
+            pygit2 is not installed or the project is not in a work tree
+        """
+        if pygit2 is None:
+            return None
+
         try:
-            result = subprocess.run(
-                ["git", "ls-files"],
-                cwd=self.project_root,
-                capture_output=True,
-                text=True,
-                check=True,
+            repo_path = pygit2.discover_repository(str(self.project_root))
+            if repo_path is None:
+                return None
+            repo = pygit2.Repository(repo_path)
+            if repo.workdir is None:
+                return None
+
+            # Index paths are relative to the work tree, ls-files output to cwd
+            prefix = (
+                self.project_root.resolve()
+                .relative_to(Path(repo.workdir).resolve())
+                .as_posix()
             )
+            prefix = "" if prefix == "." else prefix + "/"
 
-            for line in result.stdout.strip().split("\n"):
-                if line:
-                    files.append(self.project_root / line)
+            return [
+                self.project_root / entry.path[len(prefix) :]
+                for entry in repo.index
+                if entry.path.startswith(prefix)
+            ]
+        except (pygit2.GitError, OSError, ValueError):
+            return None
 
-        except subprocess.CalledProcessError:
-            # Fallback to walking directory
-            exclude_dirs = {".git", "__pycache__", "node_modules", ".venv", "venv"}
-
-            for root, dirs, filenames in os.walk(self.project_root):
-                dirs[:] = [d for d in dirs if d not in exclude_dirs]
+    def _git_index_key(self) -> Optional[Tuple[int, int, int]]:
+        """
+        Identify the current state of the git index without running git.
 
-                for filename in filenames:
-                    if not filename.startswith("."):
-                        files.append(Path(root) / filename)
+        The index file is rewritten whenever files are added, removed or
+        staged, so its identity changes exactly when `git ls-files` can.
 
-        return files
+        Returns:
+            (mtime_ns, size, inode) of the index, or None if not found
+        """
+        if not self._git_index_searched:
+            self._git_index_searched = True
+            for directory in (self.project_root, *self.project_root.parents):
+                git_dir = directory / ".git"
+                if git_dir.is_dir():
+                    self._git_index_path = git_dir / "index"
+                    break
+                if git_dir.exists():
+                    # Worktree or submodule pointer file; not worth resolving
+                    break
+
+        if self._git_index_path is None:
+            return None
+        try:
+            st = os.stat(self._git_index_path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size, st.st_ino
 
     def _score_single_file(
         self,
@@ -305,8 +554,15 @@ class FileScorer:
         intent: QueryIntent,
         keywords: List[str],
         tech_terms: Dict[str, float],
+        file_stat: Optional[os.stat_result] = None,
+        now: Optional[float] = None,
     ) -> Tuple[float, List[str]]:
-        """Score a single file."""
+        """
+        Score a single file.
+
+        file_stat and now (a time.time() value) are reused when the caller
+        already has them.
+        """
         score = 0.0
         reasons = []
 
@@ -345,10 +601,11 @@ class FileScorer:
 
         # 5. Recency bonus
         try:
-            stat = file_path.stat()
-            age_hours = (
-                datetime.now() - datetime.fromtimestamp(stat.st_mtime)
-            ).total_seconds() / 3600
+            if file_stat is None:
+                file_stat = file_path.stat()
+            if now is None:
+                now = time.time()
+            age_hours = (now - file_stat.st_mtime) / 3600
             if age_hours < 1:
                 score += 5
                 reasons.append("Modified in last hour")
@@ -402,6 +659,19 @@ class FileScorer:
 class SmartContextBuilder:
     """Builds optimized context for Gemini based on query analysis."""
 
+    # Context budget in bytes for each intent
+    _BASE_SIZES = {
+        QueryIntent.DEBUG: 80000,  # Need more context for debugging
+        QueryIntent.FEATURE: 60000,  # Medium context for features
+        QueryIntent.EXPLAIN: 40000,  # Less context for explanations
+        QueryIntent.REFACTOR: 70000,  # More context to understand structure
+        QueryIntent.TEST: 50000,  # Medium context for tests
+        QueryIntent.DOCUMENT: 50000,  # Medium context for documentation
+        QueryIntent.CONFIG: 30000,  # Less context for config
+        QueryIntent.GENERAL: 50000,  # Default medium context
+    }
+    _DEFAULT_BASE_SIZE = 50000
+
     def __init__(self, project_root: str, max_context_size: int = 100000):
         self.project_root = Path(project_root)
         self.max_context_size = max_context_size
@@ -437,35 +707,39 @@ class SmartContextBuilder:
         included_files = []
         current_size = 0
 
+        # Sections are appended as header, body and newline so large bodies
+        # are copied only once, by the final join
+
         # Always include conversation history
         if conversation_history:
-            context_parts.append(
-                f"### RECENT CONVERSATION ###\n{conversation_history}\n"
-            )
+            context_parts += [
+                "### RECENT CONVERSATION ###\n",
+                conversation_history,
+                "\n",
+            ]
             current_size += len(conversation_history)
 
         # Include session log for debugging
         if intent == QueryIntent.DEBUG and session_log:
             log_excerpt = session_log[-10000:]  # Last 10KB
-            context_parts.append(f"### RECENT SESSION LOG ###\n{log_excerpt}\n")
+            context_parts += ["### RECENT SESSION LOG ###\n", log_excerpt, "\n"]
             current_size += len(log_excerpt)
 
         # Include changes log if available
         if changes_log:
-            context_parts.append(f"### RECENT CHANGES ###\n{changes_log}\n")
+            context_parts += ["### RECENT CHANGES ###\n", changes_log, "\n"]
             current_size += len(changes_log)
 
         # Add files based on relevance
         context_parts.append("### RELEVANT PROJECT FILES ###\n")
 
-        for file_rel in scored_files:
+        for file_rel, content in self._read_files(scored_files):
             if current_size >= base_size:
                 break
 
-            file_path = self.project_root / file_rel.path
-
             try:
-                content = file_path.read_text(encoding="utf-8", errors="ignore")
+                if isinstance(content, Exception):
+                    raise content
 
                 # For large files, include only relevant portions
                 if len(content) > 5000 and file_rel.score < 50:
@@ -498,18 +772,49 @@ class SmartContextBuilder:
 
         return "".join(context_parts), included_files
 
+    def _read_files(
+        self, scored_files: Iterable[FileRelevance]
+    ) -> Iterator[Tuple[FileRelevance, object]]:
+        """
+        Read files in order while a small thread pool reads ahead.
+
+        Only READ_AHEAD files are in flight, so a caller that stops early
+        does not pay for reading the rest of the ranking.
+
+        Yields:
+            (file_rel, content); content is the exception raised when the
+            file could not be read
+        """
+        files = iter(scored_files)
+        pending = deque()
+
+        def read(file_rel):
+            try:
+                return (self.project_root / file_rel.path).read_text(
+                    encoding="utf-8", errors="ignore"
+                )
+            except Exception as e:
+                return e
+
+        with ThreadPoolExecutor(max_workers=READ_WORKERS) as pool:
+
+            def submit(batch):
+                for file_rel in batch:
+                    pending.append((file_rel, pool.submit(read, file_rel)))
+
+            submit(islice(files, READ_AHEAD))
+            try:
+                while pending:
+                    file_rel, future = pending.popleft()
+                    submit(islice(files, 1))
+                    yield file_rel, future.result()
+            finally:
+                for _, future in pending:
+                    future.cancel()
+
     def _get_base_context_size(self, intent: QueryIntent) -> int:
         """Get base context size based on intent."""
-        size_map = {
-            QueryIntent.DEBUG: 80000,  # Need more context for debugging
-            QueryIntent.FEATURE: 60000,  # Medium context for features
-            QueryIntent.EXPLAIN: 40000,  # Less context for explanations
-            QueryIntent.REFACTOR: 70000,  # More context to understand structure
-            QueryIntent.TEST: 50000,  # Medium context for tests
-            QueryIntent.CONFIG: 30000,  # Less context for config
-            QueryIntent.GENERAL: 50000,  # Default medium context
-        }
-        return size_map.get(intent, 50000)
+        return self._BASE_SIZES.get(intent, self._DEFAULT_BASE_SIZE)
 
     def _extract_relevant_portions(
         self, content: str, keywords: List[str], tech_terms: Dict[str, float]
@@ -519,28 +824,32 @@ class SmartContextBuilder:
         relevant_lines = []
         context_window = 10  # Lines before/after match
 
+        # Search the whole text once per term instead of every line per term
+        content_lower = content.lower()
+        line_starts = _line_starts(content)
+        lower_starts = (
+            line_starts
+            if len(content_lower) == len(content)
+            else _line_starts(content_lower)
+        )
+
         # Find lines with matches
+        matched_lines = set()
+        for keyword in keywords:
+            matched_lines.update(
+                _matching_lines(content_lower, keyword.lower(), lower_starts)
+            )
+        for term in tech_terms:
+            matched_lines.update(_matching_lines(content, term, line_starts))
+
         match_indices = set()
-        for i, line in enumerate(lines):
-            line_lower = line.lower()
-
-            # Check keywords
-            for keyword in keywords:
-                if keyword.lower() in line_lower:
-                    for j in range(
-                        max(0, i - context_window),
-                        min(len(lines), i + context_window + 1),
-                    ):
-                        match_indices.add(j)
-
-            # Check tech terms
-            for term in tech_terms:
-                if term in line:
-                    for j in range(
-                        max(0, i - context_window),
-                        min(len(lines), i + context_window + 1),
-                    ):
-                        match_indices.add(j)
+        for i in matched_lines:
+            match_indices.update(
+                range(
+                    max(0, i - context_window),
+                    min(len(lines), i + context_window + 1),
+                )
+            )
 
         # Build relevant portions
         if match_indices:
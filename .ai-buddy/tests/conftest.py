@@ -29,7 +29,12 @@ def mock_sessions_dir(temp_dir):
 
 @pytest.fixture
 def mock_project_root(temp_dir):
-    """Create a mock project structure."""
+    """Create a mock project structure.
+
+    Built from scratch for every test rather than hardlinked from a shared
+    template: tests rewrite these files in place (write_text truncates the
+    existing inode), which would leak changes into later tests.
+    """
     # Create typical project structure
     (temp_dir / "src").mkdir()
     (temp_dir / "tests").mkdir()
@@ -47,6 +52,20 @@ def mock_project_root(temp_dir):
     return temp_dir
 
 
+@pytest.fixture(scope="session")
+def query_analyzer():
+    """A QueryAnalyzer shared by the whole session, warmed up on first use.
+
+    Built lazily rather than in pytest_configure so runs that never touch
+    smart_context do not import it.
+    """
+    from smart_context import QueryAnalyzer
+
+    analyzer = QueryAnalyzer()
+    analyzer.analyze("warmup debug error")
+    return analyzer
+
+
 @pytest.fixture
 def mock_genai_client():
     """Mock Google GenAI client."""
@@ -0,0 +1,45 @@
+"""Tests for the JSON helpers."""
+
+import json
+import pytest
+
+import json_utils
+
+
+class TestJsonUtils:
+    """Test JSON serialization helpers."""
+
+    @pytest.mark.unit
+    def test_round_trip(self):
+        """Test that dumps output loads back to the same object."""
+        data = {"name": "café", "count": 2, "items": [1, None, True]}
+
+        encoded = json_utils.dumps(data)
+
+        assert isinstance(encoded, bytes)
+        assert json_utils.loads(encoded) == data
+        assert json.loads(encoded.decode("utf-8")) == data
+
+    @pytest.mark.unit
+    def test_indent(self):
+        """Test pretty-printed output."""
+        encoded = json_utils.dumps({"a": 1}, indent=True)
+
+        assert encoded.decode("utf-8") == '{\n  "a": 1\n}'
+
+    @pytest.mark.unit
+    def test_stdlib_fallback(self, monkeypatch):
+        """Test the standard library path when orjson is unavailable."""
+        monkeypatch.setattr(json_utils, "orjson", None)
+        data = {"name": "café", "items": [1, 2]}
+
+        encoded = json_utils.dumps(data, indent=True)
+
+        assert encoded.decode("utf-8") == json.dumps(data, indent=2, ensure_ascii=False)
+        assert json_utils.loads(encoded) == data
+
+    @pytest.mark.unit
+    def test_decode_error(self):
+        """Test that malformed input raises JSONDecodeError."""
+        with pytest.raises(json_utils.JSONDecodeError):
+            json_utils.loads(b"{invalid")
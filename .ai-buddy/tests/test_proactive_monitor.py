@@ -1,5 +1,7 @@
 """Tests for the proactive monitoring module."""
 
+import os
+import re
 import json
 import time
 import pytest
@@ -15,7 +17,12 @@ from error_patterns import (
     ErrorDetector,
     ErrorDetection,
 )
-from proactive_monitor import ProactiveMonitor, ProactiveUI
+from proactive_monitor import (
+    ProactiveMonitor,
+    ProactiveUI,
+    READ_BUFFER_SIZE,
+    _timestamp,
+)
 
 
 class TestErrorPatterns:
@@ -83,6 +90,21 @@ SyntaxError: unexpected EOF while parsing'''
         assert errors[0].severity == ErrorSeverity.CRITICAL
         assert "Move api_key to environment variable" in errors[0].suggestion
 
+    @pytest.mark.unit
+    def test_hardcoded_secret_keyword_precondition(self):
+        """Test that the secret regex only runs on lines with a keyword."""
+        detector = ErrorDetector()
+        secret_pattern = next(p for p in detector.patterns if p.name == "hardcoded_secret")
+
+        assert secret_pattern.match('username = "admin"') is None
+        assert secret_pattern.match('PASSWORD = "hunter2"') is not None
+
+        suggestions = detector.get_suggestions_for_file(
+            'user = "admin"\nToken = "abc123"\n', "app.py"
+        )
+        assert [s.line_number for s in suggestions] == [2]
+        assert suggestions[0].error_type == "potential_hardcoded_secret"
+
     @pytest.mark.unit
     def test_multiple_error_detection(self):
         """Test detecting multiple errors in log."""
@@ -123,6 +145,108 @@ Line 5'''
         assert "Line 5" in errors[0].context
         assert "KeyError" in errors[0].context
 
+    @pytest.mark.unit
+    def test_error_context_at_text_edges(self):
+        """Test context windows that run into the start or end of the text."""
+        detector = ErrorDetector()
+
+        errors = detector.detect_errors("KeyError: 'first'\nLine 2\nLine 3\nLine 4")
+        assert errors[0].context == "KeyError: 'first'\nLine 2\nLine 3"
+
+        errors = detector.detect_errors("Line 1\nLine 2\nLine 3\nKeyError: 'last'\n")
+        assert errors[0].context == "Line 2\nLine 3\nKeyError: 'last'\n"
+
+    @pytest.mark.unit
+    def test_error_detection_is_compact_and_immutable(self):
+        """Test that detections have no per-instance __dict__."""
+        error = ErrorDetection(
+            error_type="key_error",
+            category=ErrorCategory.RUNTIME,
+            severity=ErrorSeverity.ERROR,
+            line_number=None,
+            description="Dictionary key not found",
+            suggestion="Use dict.get()",
+            context=""
+        )
+
+        assert not hasattr(error, "__dict__")
+        with pytest.raises(AttributeError):
+            error.severity = ErrorSeverity.INFO
+
+    @pytest.mark.unit
+    def test_severity_rank(self):
+        """Test that severity rank orders critical first."""
+        ranks = [
+            ErrorDetection(
+                error_type="e",
+                category=ErrorCategory.RUNTIME,
+                severity=severity,
+                line_number=None,
+                description="",
+                suggestion="",
+                context=""
+            ).severity_rank
+            for severity in (
+                ErrorSeverity.CRITICAL,
+                ErrorSeverity.ERROR,
+                ErrorSeverity.WARNING,
+                ErrorSeverity.INFO,
+            )
+        ]
+
+        assert ranks == sorted(ranks)
+        assert len(set(ranks)) == 4
+
+    @pytest.mark.unit
+    def test_line_prefilter_keeps_pattern_flags(self):
+        """Test that merged line patterns keep their own regex flags."""
+        patterns = [
+            ErrorPattern(
+                name="shout",
+                category=ErrorCategory.RUNTIME,
+                severity=ErrorSeverity.ERROR,
+                pattern=re.compile(r'panic: (\w+)', re.IGNORECASE),
+                description="Panic",
+                suggestion_template="Panic in {where}",
+                extract_groups=["where"]
+            ),
+            ErrorPattern(
+                name="exact",
+                category=ErrorCategory.RUNTIME,
+                severity=ErrorSeverity.WARNING,
+                pattern=re.compile(r'warn: (\w+)'),
+                description="Warning",
+                suggestion_template="Warning in {where}",
+                extract_groups=["where"]
+            ),
+        ]
+        detector = ErrorDetector(patterns)
+
+        errors = detector.detect_errors("PANIC: main\nWARN: skipped\nwarn: loop")
+
+        assert [e.suggestion for e in errors] == ["Panic in main", "Warning in loop"]
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize(
+        "regex", [r'^ERROR: (.+)$', r'\AERROR: (.+)\Z', r'ERROR: (\w+)(?!\s)']
+    )
+    def test_line_prefilter_keeps_anchored_patterns(self, regex):
+        """Test that anchored line patterns still match on every line."""
+        pattern = ErrorPattern(
+            name="anchored",
+            category=ErrorCategory.RUNTIME,
+            severity=ErrorSeverity.ERROR,
+            pattern=re.compile(regex),
+            description="Anchored error",
+            suggestion_template="Error: {message}",
+            extract_groups=["message"]
+        )
+        detector = ErrorDetector([pattern])
+
+        errors = detector.detect_errors("start\nERROR: one\nok\nERROR: two")
+
+        assert [e.suggestion for e in errors] == ["Error: one", "Error: two"]
+
     @pytest.mark.unit
     def test_new_error_detection(self):
         """Test detecting only new errors."""
@@ -146,6 +270,18 @@ Line 5'''
         errors4 = detector.detect_new_errors(log1, "session_456")
         assert len(errors4) == 1
 
+    @pytest.mark.unit
+    def test_new_error_detection_skips_repeated_content(self):
+        """Test that identical content is not re-scanned for a session."""
+        detector = ErrorDetector()
+        log = "KeyError: 'key1'"
+
+        assert len(detector.detect_new_errors(log, "session_123")) == 1
+
+        with patch.object(detector, 'detect_errors') as mock_detect:
+            assert detector.detect_new_errors(log, "session_123") == []
+            mock_detect.assert_not_called()
+
 
 class TestProactiveMonitor:
     """Test proactive monitoring functionality."""
@@ -171,12 +307,49 @@ class TestProactiveMonitor:
         # Start monitoring
         monitor.start()
         assert monitor.monitoring is True
-        assert monitor.monitor_thread is not None
-        assert monitor.monitor_thread.is_alive()
+        assert monitor.monitor_process is not None
+        assert monitor.monitor_process.is_alive()
         
         # Stop monitoring
         monitor.stop()
         assert monitor.monitoring is False
+        assert not monitor.monitor_process.is_alive()
+
+    @pytest.mark.unit
+    def test_clear_suggestions_reaches_monitor_process(
+        self, temp_dir, mock_sessions_dir
+    ):
+        """Test cleared suggestions do not come back from the child process."""
+        log_file = temp_dir / "test_session.log"
+        log_file.touch()
+        monitor = ProactiveMonitor(
+            str(log_file), str(mock_sessions_dir), check_interval=0.05
+        )
+
+        def wait_for_suggestions(count):
+            deadline = time.time() + 5
+            while time.time() < deadline:
+                suggestions = monitor.get_active_suggestions()
+                if len(suggestions) == count:
+                    return suggestions
+                time.sleep(0.05)
+            return monitor.get_active_suggestions()
+
+        monitor.start()
+        try:
+            with open(log_file, 'a') as f:
+                f.write("KeyError: 'key1'\n")
+            assert len(wait_for_suggestions(1)) == 1
+
+            monitor.clear_suggestions()
+            assert monitor.get_active_suggestions() == []
+
+            with open(log_file, 'a') as f:
+                f.write("NameError: name 'x' is not defined\n")
+            suggestions = wait_for_suggestions(1)
+            assert [s["error_type"] for s in suggestions] == ["name_error"]
+        finally:
+            monitor.stop()
 
     @pytest.mark.unit
     def test_session_id_extraction(self, temp_dir, mock_sessions_dir):
@@ -213,6 +386,148 @@ class TestProactiveMonitor:
             mock_process.assert_called_once()
             assert "KeyError" in mock_process.call_args[0][0]
 
+    @pytest.mark.unit
+    def test_reopen_keeps_position_unless_rotated(self, monitor):
+        """Test the read position only resets when the log file is replaced."""
+        log_file = Path(monitor.log_file)
+        log_file.write_text("KeyError: 'old'\n")
+        monitor.last_position = log_file.stat().st_size
+
+        with patch.object(monitor, '_process_new_content') as mock_process:
+            # A preset position is kept on first open
+            with open(log_file, 'a') as f:
+                f.write("KeyError: 'new'\n")
+            monitor._check_for_new_content()
+            assert mock_process.call_args[0][0] == "KeyError: 'new'\n"
+
+            # Closing and reopening the same file does not re-read it
+            monitor._close_log()
+            mock_process.reset_mock()
+            monitor._check_for_new_content()
+            mock_process.assert_not_called()
+
+            # A rotated log is read from the start; the old file is still
+            # open, so the replacement cannot reuse its inode
+            rotated = log_file.with_name("rotated.log")
+            rotated.write_text("KeyError: 'rotated'\n")
+            os.replace(rotated, log_file)
+            monitor._check_for_new_content()
+            assert mock_process.call_args[0][0] == "KeyError: 'rotated'\n"
+        monitor.stop()
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("use_preadv", [True, False])
+    def test_check_for_new_content_reuses_buffer(self, monitor, monkeypatch, use_preadv):
+        """Test that polls read into the same buffer with or without preadv."""
+        if not use_preadv:
+            monkeypatch.delattr(os, "preadv", raising=False)
+        log_file = Path(monitor.log_file)
+        buffer = monitor._read_buffer
+
+        with patch.object(monitor, '_process_new_content') as mock_process:
+            log_file.write_text("first line\n")
+            monitor._check_for_new_content()
+            with open(log_file, 'a') as f:
+                f.write("KeyError: 'key1'\n")
+            monitor._check_for_new_content()
+
+        assert monitor._read_buffer is buffer
+        assert monitor.last_position == log_file.stat().st_size
+        assert mock_process.call_args[0][0] == "first line\nKeyError: 'key1'\n"
+        monitor.stop()
+
+    @pytest.mark.unit
+    def test_large_backlog_read_in_buffer_sized_pieces(self, monitor):
+        """Test a delta larger than the buffer is read whole without growing it."""
+        log_file = Path(monitor.log_file)
+        content = "é" * READ_BUFFER_SIZE + "\nKeyError: 'key1'\n"
+        log_file.write_text(content, encoding="utf-8")
+
+        with patch.object(monitor, '_process_new_content') as mock_process:
+            monitor._check_for_new_content()
+
+        assert len(monitor._read_buffer) == READ_BUFFER_SIZE
+        assert monitor.last_position == log_file.stat().st_size
+        assert mock_process.call_args[0][0] == content
+        monitor.stop()
+
+    @pytest.mark.unit
+    def test_check_for_new_content_split_multibyte(self, monitor):
+        """Test that a UTF-8 character split across polls is not lost."""
+        log_file = Path(monitor.log_file)
+        encoded = "KeyError: 'café'\n".encode("utf-8")
+        split = encoded.index(b"\xc3") + 1
+
+        with patch.object(monitor, '_process_new_content') as mock_process:
+            log_file.write_bytes(encoded[:split])
+            monitor._check_for_new_content()
+            with open(log_file, 'ab') as f:
+                f.write(encoded[split:])
+            monitor._check_for_new_content()
+
+        # The second scan carries the first chunk as overlap
+        assert mock_process.call_args[0][0] == "KeyError: 'café'\n"
+        monitor.stop()
+
+    @pytest.mark.unit
+    def test_error_split_across_polls(self, monitor):
+        """Test that a multi-line error split across polls is detected once."""
+        log_file = Path(monitor.log_file)
+        log_file.write_text('File "test.py", line 42\n    print("hello"\n')
+        monitor._check_for_new_content()
+        assert len(monitor.active_suggestions) == 0
+
+        with open(log_file, 'a') as f:
+            f.write("            ^\nSyntaxError: unexpected EOF while parsing\n")
+        monitor._check_for_new_content()
+
+        with open(log_file, 'a') as f:
+            f.write("KeyError: 'key1'\n")
+        monitor._check_for_new_content()
+
+        error_types = [s["error_type"] for s in monitor.active_suggestions]
+        assert error_types == ["python_syntax_error", "key_error"]
+        monitor.stop()
+
+    @pytest.mark.unit
+    def test_error_line_split_across_polls(self, monitor):
+        """Test an error line whose newline arrives later is reported once."""
+        log_file = Path(monitor.log_file)
+        log_file.write_text("line a\nline b\nKeyError: 'alpha'")
+        monitor._check_for_new_content()
+        assert len(monitor.active_suggestions) == 0
+
+        with open(log_file, 'a') as f:
+            f.write("\nline c\n")
+        monitor._check_for_new_content()
+
+        error_types = [s["error_type"] for s in monitor.active_suggestions]
+        assert error_types == ["key_error"]
+        monitor.stop()
+
+    @pytest.mark.unit
+    def test_consecutive_syntax_errors_across_polls(self, monitor):
+        """Test a syntax error after one already in the overlap is reported."""
+        log_file = Path(monitor.log_file)
+
+        def syntax_error(filename):
+            return (
+                f'File "{filename}", line 3\n    x = (\n        ^\n'
+                "SyntaxError: invalid syntax\n"
+            )
+
+        log_file.write_text(syntax_error("a.py"))
+        monitor._check_for_new_content()
+        with open(log_file, 'a') as f:
+            f.write(syntax_error("b.py"))
+        monitor._check_for_new_content()
+
+        suggestions = [s["suggestion"] for s in monitor.active_suggestions]
+        assert len(suggestions) == 2
+        assert "a.py" in suggestions[0]
+        assert "b.py" in suggestions[1]
+        monitor.stop()
+
     @pytest.mark.unit
     def test_process_new_content_with_errors(self, monitor):
         """Test processing content with errors."""
@@ -231,6 +546,21 @@ class TestProactiveMonitor:
                 # Should not notify for single non-critical error
                 mock_notify.assert_not_called()
 
+    @pytest.mark.unit
+    def test_process_new_content_saves_once_per_batch(self, monitor):
+        """Test that a batch of errors writes the suggestions file once."""
+        content = (
+            "ModuleNotFoundError: No module named 'a'\n"
+            "KeyError: 'b'\n"
+            "NameError: name 'c' is not defined\n"
+        )
+
+        with patch.object(monitor, '_save_suggestions') as mock_save:
+            monitor._process_new_content(content)
+
+        mock_save.assert_called_once()
+        assert len(monitor.active_suggestions) == 3
+
     @pytest.mark.unit
     def test_process_critical_error_notification(self, monitor):
         """Test that critical errors trigger notification."""
@@ -314,6 +644,37 @@ class TestProactiveMonitor:
         assert data["suggestions"][0]["error_type"] == "test_error"
         assert data["suggestions"][0]["line_number"] == 42
 
+    @pytest.mark.unit
+    def test_notification_written_atomically(self, monitor):
+        """Test that notifications are renamed into place, not written in place."""
+        error = ErrorDetection(
+            error_type="critical",
+            category=ErrorCategory.SECURITY,
+            severity=ErrorSeverity.CRITICAL,
+            line_number=None,
+            description="Critical error",
+            suggestion="Fix immediately",
+            context=""
+        )
+
+        with patch("proactive_monitor.os.replace", wraps=os.replace) as mock_replace:
+            monitor._send_notification([error])
+
+        mock_replace.assert_called_once()
+        assert Path(mock_replace.call_args[0][1]) == monitor.notification_file
+        assert monitor.notification_file.exists()
+        assert not list(monitor.sessions_dir.glob("*.part"))
+
+    @pytest.mark.unit
+    def test_timestamp_matches_isoformat(self):
+        """Test that cached timestamps match datetime.isoformat()."""
+        with freeze_time("2025-01-12 10:00:00"):
+            assert _timestamp() == datetime.now().isoformat()
+        with freeze_time("2025-01-12 10:00:00.123456"):
+            assert _timestamp() == datetime.now().isoformat()
+        with freeze_time("2025-01-12 10:00:01.5"):
+            assert _timestamp() == datetime.now().isoformat()
+
     @pytest.mark.unit
     def test_notification_creation(self, monitor):
         """Test notification file creation."""
@@ -372,6 +733,28 @@ class TestProactiveMonitor:
         # Should only keep max_suggestions
         assert len(monitor.active_suggestions) == monitor.max_suggestions
 
+    @pytest.mark.unit
+    def test_max_suggestions_keeps_most_recent(self, monitor):
+        """Test that older suggestions, even critical ones, age out."""
+        critical = ErrorDetection(
+            error_type="critical",
+            category=ErrorCategory.SECURITY,
+            severity=ErrorSeverity.CRITICAL,
+            line_number=None,
+            description="Critical",
+            suggestion="Fix now",
+            context=""
+        )
+        monitor._add_suggestion(critical, save=False)
+        for i in range(monitor.max_suggestions):
+            monitor._add_suggestion(critical._replace(
+                error_type=f"warning_{i}",
+                severity=ErrorSeverity.WARNING
+            ), save=False)
+
+        error_types = [s["error_type"] for s in monitor.active_suggestions]
+        assert error_types == [f"warning_{i}" for i in range(monitor.max_suggestions)]
+
 
 class TestProactiveUI:
     """Test proactive UI functionality."""
@@ -1,11 +1,20 @@
 """Tests for the repo blob generator module."""
 
+import os
+import threading
 import pytest
 from pathlib import Path
 from unittest.mock import patch, MagicMock, mock_open
 import subprocess
 
-from repo_blob_generator import generate_repo_blob, RepoBlobGenerator
+from repo_blob_generator import (
+    generate_repo_blob,
+    RepoBlobGenerator,
+    READ_AHEAD,
+    SENDFILE_MIN_SIZE,
+    TEXT_PROBE_SIZE,
+    _is_text_file_cached,
+)
 
 
 class TestRepoBlobGenerator:
@@ -48,6 +57,36 @@ class TestRepoBlobGenerator:
 
         assert generator.is_text_file(unicode_file)
 
+    @pytest.mark.unit
+    def test_is_text_file_binary_magic(self, generator, temp_dir):
+        """Test known binary headers are rejected even without null bytes."""
+        pdf_file = temp_dir / "doc.pdf"
+        pdf_file.write_bytes(b"%PDF-1.4\n% plain ascii header\n")
+
+        assert not generator.is_text_file(pdf_file)
+
+    @pytest.mark.unit
+    def test_is_text_file_multibyte_at_probe_boundary(self, generator, temp_dir):
+        """Test a character cut by the probe size does not mark text as binary."""
+        text_file = temp_dir / "boundary.md"
+        text_file.write_text("a" * (TEXT_PROBE_SIZE - 1) + "é", encoding="utf-8")
+
+        assert generator.is_text_file(text_file)
+
+    @pytest.mark.unit
+    def test_is_text_file_cached_until_file_changes(self, generator, temp_dir):
+        """Test repeated probes are cached and a rewritten file is probed again."""
+        file_path = temp_dir / "data.txt"
+        file_path.write_text("plain text")
+
+        assert generator.is_text_file(file_path)
+        hits = _is_text_file_cached.cache_info().hits
+        assert generator.is_text_file(file_path)
+        assert _is_text_file_cached.cache_info().hits == hits + 1
+
+        file_path.write_bytes(b"\x00\x01 now binary")
+        assert not generator.is_text_file(file_path)
+
     @pytest.mark.unit
     def test_is_text_file_nonexistent(self, generator, temp_dir):
         """Test handling non-existent files."""
@@ -79,6 +118,9 @@ class TestRepoBlobGenerator:
             ".venv/lib/python3.9/site.py",
             "venv/bin/activate",
             ".ai-buddy/config.py",
+            "secrets.env",
+            "config/prod.env",
+            ".env/lib/site.py",
         ]
 
         for file_path in excluded_files:
@@ -104,6 +146,15 @@ class TestRepoBlobGenerator:
                 file_path
             ), f"Should not exclude: {file_path}"
 
+    @pytest.mark.unit
+    def test_should_exclude_dir_matches_whole_names(self, generator):
+        """Test directory exclusion matches exact base names only."""
+        assert generator.should_exclude_dir("node_modules")
+        assert generator.should_exclude_dir("env")
+        assert not generator.should_exclude_dir("myenv")
+        assert not generator.should_exclude("myenv/settings.py")
+        assert generator.should_exclude("config/.env.local")
+
     @pytest.mark.unit
     def test_find_files_by_extension(self, generator, temp_dir):
         """Test finding files by extension."""
@@ -126,25 +177,40 @@ class TestRepoBlobGenerator:
     @patch("subprocess.run")
     def test_get_git_files_success(self, mock_run, generator):
         """Test getting git files successfully."""
-        # Mock git commands
-        mock_rev_parse = MagicMock()
-        mock_rev_parse.returncode = 0
-
+        # Mock git ls-files output (NUL separated)
         mock_ls_files = MagicMock()
-        mock_ls_files.stdout = "src/main.py\nsrc/utils.py\nREADME.md\n.gitignore"
+        mock_ls_files.stdout = b"src/main.py\0src/utils.py\0README.md\0.gitignore\0"
         mock_ls_files.returncode = 0
 
-        mock_run.side_effect = [mock_rev_parse, mock_ls_files]
+        mock_run.return_value = mock_ls_files
 
         files = generator.get_git_files()
 
-        # Should call git commands
-        assert mock_run.call_count == 2
+        # Should discover files with a single git call
+        assert mock_run.call_count == 1
         assert files is not None
         assert "src/main.py" in files
         assert "src/utils.py" in files
         assert "README.md" in files
 
+    @pytest.mark.unit
+    @patch("subprocess.run")
+    def test_get_git_files_unusual_names(self, mock_run, generator):
+        """Test filenames containing newlines survive the NUL-separated output."""
+        mock_run.return_value = MagicMock(
+            returncode=0, stdout=b"odd\nname.py\0plain.py\0"
+        )
+
+        assert generator.get_git_files() == {"odd\nname.py", "plain.py"}
+
+    @pytest.mark.unit
+    @patch("subprocess.run")
+    def test_get_git_files_nonzero_exit(self, mock_run, generator):
+        """Test a failing git call is treated as no repository."""
+        mock_run.return_value = MagicMock(returncode=128, stdout=b"")
+
+        assert generator.get_git_files() is None
+
     @pytest.mark.unit
     @patch("subprocess.run")
     def test_get_git_files_not_git_repo(self, mock_run, generator):
@@ -179,6 +245,75 @@ class TestRepoBlobGenerator:
         assert not any("__pycache__" in path for path in file_paths)
         assert not any(".git" in path for path in file_paths)
 
+    @pytest.mark.unit
+    def test_find_files_by_extension_nested(self, generator, temp_dir):
+        """Test the walk recurses, prunes excluded trees and skips directories."""
+        (temp_dir / "src" / "pkg").mkdir(parents=True)
+        (temp_dir / "src" / "pkg" / "mod.py").write_text("x = 1")
+        (temp_dir / "web" / "node_modules" / "lib").mkdir(parents=True)
+        (temp_dir / "web" / "node_modules" / "lib" / "index.js").write_text("")
+        (temp_dir / "folder.py").mkdir()
+
+        files = generator.find_files_by_extension()
+
+        assert files == {temp_dir / "src" / "pkg" / "mod.py"}
+
+    @pytest.mark.unit
+    def test_find_files_by_extension_special_names(self, generator, temp_dir):
+        """Test well-known extension-less files are found but hidden ones are not."""
+        (temp_dir / "Makefile").write_text("all:\n")
+        (temp_dir / "Dockerfile").write_text("FROM python:3.11\n")
+        (temp_dir / "LICENSE").write_text("MIT\n")
+        (temp_dir / ".py").write_text("")
+
+        files = generator.find_files_by_extension()
+
+        assert {f.name for f in files} == {"Makefile", "Dockerfile"}
+
+    @pytest.mark.unit
+    def test_find_files_by_extension_matches_relative_paths(self, temp_dir):
+        """Test exclusions apply below the project root, not to its parents."""
+        project = temp_dir / "venv" / "project"
+        project.mkdir(parents=True)
+        (project / "main.py").write_text("print('hello')")
+
+        files = RepoBlobGenerator(str(project)).find_files_by_extension()
+
+        assert {f.name for f in files} == {"main.py"}
+
+    @pytest.mark.unit
+    @patch("subprocess.run")
+    def test_discover_files_prefers_git(self, mock_run, generator, temp_dir):
+        """Test the git listing wins over the concurrent extension walk."""
+        (temp_dir / "walked.py").write_text("print('walked')")
+        mock_run.return_value = MagicMock(returncode=0, stdout=b"tracked.py\0")
+
+        git_files, walked = generator.discover_files()
+
+        assert git_files == {"tracked.py"}
+        assert walked is None
+
+    @pytest.mark.unit
+    @patch("subprocess.run")
+    def test_discover_files_without_git(self, mock_run, generator, temp_dir):
+        """Test prefer_git=False walks the tree without spawning git."""
+        (temp_dir / "walked.py").write_text("print('walked')")
+
+        git_files, walked = generator.discover_files(prefer_git=False)
+
+        mock_run.assert_not_called()
+        assert git_files is None
+        assert walked == [(str(temp_dir / "walked.py"), "walked.py")]
+
+    @pytest.mark.unit
+    def test_find_files_by_extension_cancelled(self, generator, temp_dir):
+        """Test a set cancel event stops the walk."""
+        (temp_dir / "main.py").write_text("print('hello')")
+        cancel = threading.Event()
+        cancel.set()
+
+        assert generator.find_files_by_extension(cancel) == set()
+
 
 class TestGenerateRepoBlob:
     """Test repo blob generation."""
@@ -288,14 +423,11 @@ class TestGenerateRepoBlob:
         (mock_project_root / "excluded.log").write_text("log content")
 
         # Mock git to return only some files
-        mock_rev_parse = MagicMock()
-        mock_rev_parse.returncode = 0
-
         mock_ls_files = MagicMock()
-        mock_ls_files.stdout = "included.py"
+        mock_ls_files.stdout = b"included.py\0"
         mock_ls_files.returncode = 0
 
-        mock_run.side_effect = [mock_rev_parse, mock_ls_files]
+        mock_run.return_value = mock_ls_files
 
         output_file = mock_project_root / "output.txt"
         result = generator.generate(str(output_file))
@@ -305,3 +437,86 @@ class TestGenerateRepoBlob:
 
         # Should include git-tracked files
         assert "included.py" in content or "print('included')" in content
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("sendfile_works", [True, False])
+    def test_generate_copies_file_bytes(
+        self, mock_project_root, monkeypatch, sendfile_works
+    ):
+        """Test small and large files are copied verbatim, with or without sendfile."""
+        if not sendfile_works:
+
+            def failing_sendfile(*args):
+                raise OSError("sendfile unsupported")
+
+            monkeypatch.setattr(os, "sendfile", failing_sendfile, raising=False)
+
+        large = "".join(f"line {i} é\n" for i in range(SENDFILE_MIN_SIZE // 8))
+        (mock_project_root / "large.txt").write_text(large, encoding="utf-8")
+        (mock_project_root / "small.py").write_text("x = 1", encoding="utf-8")
+
+        output_file = mock_project_root / "output.txt"
+        generator = RepoBlobGenerator(str(mock_project_root))
+        assert generator.generate(str(output_file), prefer_git=False)
+
+        content = output_file.read_text(encoding="utf-8")
+        large_block = f"--- START FILE: large.txt ---\n{large}--- END FILE: large.txt ---"
+        small_block = "--- START FILE: small.py ---\nx = 1\n--- END FILE: small.py ---"
+        assert large_block in content
+        assert small_block in content
+
+    @pytest.mark.unit
+    def test_generate_keeps_sorted_order_with_read_ahead(self, mock_project_root):
+        """Test files prefetched in parallel are still written in sorted order."""
+        names = [f"mod_{i:03d}.py" for i in range(READ_AHEAD * 2 + 5)]
+        for name in reversed(names):
+            (mock_project_root / name).write_text(f"# {name}")
+
+        output_file = mock_project_root / "output.txt"
+        generator = RepoBlobGenerator(str(mock_project_root))
+        assert generator.generate(str(output_file), prefer_git=False)
+
+        content = output_file.read_text()
+        positions = [content.index(f"--- START FILE: {name} ---") for name in names]
+        assert positions == sorted(positions)
+        assert "# mod_000.py\n--- END FILE: mod_000.py ---" in content
+
+    @pytest.mark.unit
+    @patch("subprocess.run")
+    def test_generate_git_files_skips_binary_and_missing(
+        self, mock_run, mock_project_root
+    ):
+        """Test git-listed files are filtered by type and content in one read."""
+        (mock_project_root / "main.py").write_text("print('main')")
+        (mock_project_root / "image.png").write_bytes(b"\x89PNG\r\n\x1a\n")
+        (mock_project_root / "pkg").mkdir()
+        mock_run.return_value = MagicMock(
+            returncode=0, stdout=b"main.py\0image.png\0pkg\0deleted.py\0"
+        )
+
+        output_file = mock_project_root / "output.txt"
+        assert RepoBlobGenerator(str(mock_project_root)).generate(str(output_file))
+
+        content = output_file.read_text()
+        assert "--- START FILE: main.py ---\nprint('main')\n" in content
+        assert "image.png" not in content
+        assert "START FILE: pkg" not in content
+        assert "deleted.py" not in content
+
+    @pytest.mark.unit
+    @patch("subprocess.run")
+    def test_generate_known_text_extension_skips_probe(
+        self, mock_run, mock_project_root
+    ):
+        """Test large files with a known text extension are not sniffed first."""
+        data = "[" + "1," * SENDFILE_MIN_SIZE + "1]"
+        (mock_project_root / "data.json").write_text(data)
+        mock_run.return_value = MagicMock(returncode=0, stdout=b"data.json\0")
+
+        generator = RepoBlobGenerator(str(mock_project_root))
+        output_file = mock_project_root / "output.txt"
+        with patch.object(generator, "is_text_file") as is_text_file:
+            assert generator.generate(str(output_file))
+
+        is_text_file.assert_not_called()
+        assert "--- START FILE: data.json ---" in output_file.read_text()
@@ -268,3 +268,113 @@ class TestSessionManager:
         assert session is not None
         assert session["id"] == session_id
         assert session["project_root"] == "/test/project"
+
+    @pytest.mark.unit
+    def test_index_loaded_on_first_use(self, mock_sessions_dir):
+        """Test the index file is not read until the sessions are needed."""
+        index_file = mock_sessions_dir / "session_index.json"
+        manager = SessionManager(str(mock_sessions_dir))
+
+        index_file.write_text(json.dumps({"sessions": [{"id": "late"}]}))
+
+        assert manager.get_session("late") == {"id": "late"}
+
+    @pytest.mark.unit
+    def test_deferred_save_until_flush(self, mock_sessions_dir):
+        """Test autosave=False batches changes into a single write on flush."""
+        index_file = mock_sessions_dir / "session_index.json"
+        manager = SessionManager(str(mock_sessions_dir), autosave=False)
+
+        manager.create_session("session1", "/project1")
+        manager.create_session("session2", "/project2")
+        manager.update_session_access("session1")
+        assert not index_file.exists()
+
+        with patch.object(manager, "_save_index", wraps=manager._save_index) as save:
+            manager.flush()
+            manager.flush()
+        assert save.call_count == 1
+
+        reloaded = SessionManager(str(mock_sessions_dir))
+        assert [s["id"] for s in reloaded.sessions_index["sessions"]] == [
+            "session1",
+            "session2",
+        ]
+
+    @pytest.mark.unit
+    def test_changes_appended_to_event_log(self, mock_sessions_dir):
+        """Test changes after the first save append events instead of rewriting."""
+        index_file = mock_sessions_dir / "session_index.json"
+        events_file = mock_sessions_dir / "session_events.jsonl"
+        manager = SessionManager(str(mock_sessions_dir))
+
+        manager.create_session("session1", "/project1")
+        snapshot = index_file.read_text()
+
+        manager.create_session("session2", "/project2")
+        with freeze_time("2025-01-12 11:00:00"):
+            manager.update_session_access("session1")
+
+        assert index_file.read_text() == snapshot
+        events = [json.loads(line) for line in events_file.read_text().splitlines()]
+        assert [e["op"] for e in events] == ["create", "access"]
+
+        reloaded = SessionManager(str(mock_sessions_dir))
+        assert reloaded.get_session("session2")["project_root"] == "/project2"
+        assert reloaded.get_session("session1")["last_accessed"] == (
+            "2025-01-12T11:00:00"
+        )
+
+    @pytest.mark.unit
+    def test_event_log_compacted_into_index(self, mock_sessions_dir, monkeypatch):
+        """Test the event log is folded into the index at the threshold."""
+        import session_manager
+
+        monkeypatch.setattr(session_manager, "COMPACT_THRESHOLD", 3)
+        events_file = mock_sessions_dir / "session_events.jsonl"
+        manager = SessionManager(str(mock_sessions_dir))
+
+        for i in range(4):
+            manager.create_session(f"session{i}", f"/project{i}")
+
+        assert events_file.read_text() == ""
+        snapshot = json.loads((mock_sessions_dir / "session_index.json").read_text())
+        assert len(snapshot["sessions"]) == 4
+
+    @pytest.mark.unit
+    def test_event_log_skips_torn_lines(self, mock_sessions_dir):
+        """Test an incomplete trailing event does not break loading."""
+        manager = SessionManager(str(mock_sessions_dir))
+        manager.create_session("session1", "/project1")
+        manager.create_session("session2", "/project2")
+
+        with open(mock_sessions_dir / "session_events.jsonl", "a") as f:
+            f.write('{"op": "create", "sess')
+
+        reloaded = SessionManager(str(mock_sessions_dir))
+        assert [s["id"] for s in reloaded.sessions_index["sessions"]] == [
+            "session1",
+            "session2",
+        ]
+
+        # The next event must not be appended onto the torn line
+        reloaded.create_session("session3", "/project3")
+        reloaded_again = SessionManager(str(mock_sessions_dir))
+        assert [s["id"] for s in reloaded_again.sessions_index["sessions"]] == [
+            "session1",
+            "session2",
+            "session3",
+        ]
+
+    @pytest.mark.unit
+    def test_list_recent_sessions_ties_keep_creation_order(self, mock_sessions_dir):
+        """Test sessions with equal access times keep their creation order."""
+        manager = SessionManager(str(mock_sessions_dir))
+
+        with freeze_time("2025-01-12 10:00:00"):
+            for i in range(4):
+                manager.create_session(f"session{i}", f"/project{i}")
+
+        recent = manager.list_recent_sessions(limit=3)
+
+        assert [s["id"] for s in recent] == ["session0", "session1", "session2"]